@@ -1,20 +1,417 @@
 import argparse
 import json
+import multiprocessing
 import os
-import glob
+import platform
+import re
+import sys
+import tempfile
+import threading
+from collections import Counter
+from queue import Queue
 from datetime import datetime as dt
-from shutil import copy2 as cp
+from shutil import copy2 as cp, copyfileobj, copystat
+import PIL
 from PIL import Image, ImageDraw
 import pytz
 from timezonefinder import TimezoneFinder
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from tqdm import tqdm
 from tqdm.contrib.logging import logging_redirect_tqdm
 import logging
 
 from exiftool import ExifToolHelper as et
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# orjson is optional, it parses large exports a lot faster than the json module
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Camera hints in conversation image filenames
+CAMERA_ROLE_RE = re.compile(r"secondary|front|back")
+
+
+# ioctl request number for reflinking a file on Linux (linux/fs.h)
+FICLONE = 0x40049409
+
+
+def fast_copy(src: str, dst: str):
+    """
+    Copies a file with its timestamps. On Linux filesystems that support it (btrfs, XFS, ...)
+    the copy is a reflink that shares the data blocks with the source instead of
+    duplicating them. Otherwise copy_file_range() copies inside the kernel.
+    Falls back to a regular copy everywhere else.
+    """
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+                try:
+                    fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+                except OSError:
+                    if not hasattr(os, "copy_file_range"):
+                        raise
+                    remaining = os.fstat(src_file.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(src_file.fileno(), dst_file.fileno(), remaining)
+                        if copied == 0:
+                            # Some filesystems stop early instead of failing
+                            raise OSError(f"copy_file_range stopped with {remaining} bytes left")
+                        remaining -= copied
+            copystat(src, dst)
+            return
+        except OSError:
+            # Don't leave a partial copy behind if the regular copy fails too
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+    cp(src, dst)
+
+
+def sniff_format(img_path: str):
+    """
+    Detects the image format from the file's magic bytes.
+    Returns 'jpeg', 'webp', 'png' or None if the format isn't recognized.
+    """
+    with open(img_path, "rb") as f:
+        header = f.read(12)
+    if header[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    return None
+
+
+@lru_cache(maxsize=64)
+def rounded_mask_bytes(width: int, height: int, radius: int) -> bytes:
+    """
+    Renders a rounded rectangle mask and returns its raw 'L' pixel data.
+    Composites of one export mostly share the same size, so the masks are cached.
+    """
+    radius = min(radius, width // 2, height // 2)
+    mask = Image.new('L', (width, height), 255)
+    if radius <= 0:
+        return mask.tobytes()
+
+    # Only the corners need anti-aliasing, so supersample a single corner (4x resolution)
+    # instead of the whole mask
+    scale = 4
+    large_radius = radius * scale
+    corner = Image.new('L', (large_radius, large_radius), 0)
+    draw = ImageDraw.Draw(corner)
+    draw.ellipse((0, 0, large_radius * 2, large_radius * 2), fill=255)
+    
+    # Downsample with high-quality resampling for anti-aliasing
+    corner = corner.resize((radius, radius), Image.Resampling.LANCZOS)
+
+    # Mirror the top left corner into the other three
+    mask.paste(corner, (0, 0))
+    mask.paste(corner.transpose(Image.Transpose.FLIP_LEFT_RIGHT), (width - radius, 0))
+    mask.paste(corner.transpose(Image.Transpose.FLIP_TOP_BOTTOM), (0, height - radius))
+    mask.paste(corner.transpose(Image.Transpose.ROTATE_180), (width - radius, height - radius))
+    return mask.tobytes()
+
+
+def create_rounded_mask(size, radius):
+    """
+    Creates a rounded rectangle mask for the given size and radius with anti-aliasing.
+    """
+    return Image.frombytes('L', size, rounded_mask_bytes(size[0], size[1], radius))
+
+
+def render_composite(primary_path: str, secondary_path: str, output_path: str, webp_method: int = 4):
+    """
+    Renders the secondary image with a border and rounded corners onto the primary image
+    and saves the result as WEBP.
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    # Open both images, the files are closed as soon as the composite is saved
+    with Image.open(primary_path) as primary, Image.open(secondary_path) as secondary:
+
+        # Calculate secondary image size (about 1/3 of primary width)
+        secondary_width = primary.width // 3
+        secondary_height = int(secondary.height * (secondary_width / secondary.width))
+
+        # JPEG sources can be decoded at a reduced scale since the overlay is much smaller
+        # (no-op for other formats)
+        secondary.draft('RGB', (secondary_width, secondary_height))
+
+        # Resize secondary image
+        secondary_resized = secondary.resize((secondary_width, secondary_height), Image.Resampling.LANCZOS)
+
+        # Create rounded corners for the secondary image
+        corner_radius = min(secondary_width, secondary_height) // 10  # 10% of the smaller dimension
+        border_width = 4
+
+        # Create secondary image with border
+        bordered_width = secondary_width + (border_width * 2)
+        bordered_height = secondary_height + (border_width * 2)
+
+        # Create a black background for the border
+        bordered_image = Image.new('RGBA', (bordered_width, bordered_height), (0, 0, 0, 255))
+
+        # Create a mask with rounded corners for the bordered image
+        border_mask = create_rounded_mask((bordered_width, bordered_height), corner_radius + border_width)
+
+        # Apply the border mask
+        bordered_image.putalpha(border_mask)
+
+        # Create a mask with rounded corners for the inner image
+        inner_mask = create_rounded_mask((secondary_width, secondary_height), corner_radius)
+
+        # Apply the mask to create rounded corners on the secondary image
+        # (putalpha adds the alpha band in place, no need for a transparent canvas to paste into)
+        secondary_resized.putalpha(inner_mask)
+
+        # Paste the secondary image onto the bordered background
+        bordered_image.paste(secondary_resized, (border_width, border_width), secondary_resized)
+
+        # Convert the primary image to RGB, WEBP output doesn't need an alpha channel
+        # and the overlay's alpha is only used as the paste mask
+        composite = primary.convert('RGB')
+
+        # Add padding (20 pixels from top and left)
+        padding = 20
+
+        # Paste the bordered secondary image onto the primary with padding
+        composite.paste(bordered_image, (padding, padding), bordered_image)
+
+        # Save the composite image
+        composite.save(output_path, "WEBP", quality=95, method=webp_method)
+
+    # Release the full-size buffer right away instead of waiting for the GC,
+    # several workers may be compositing at the same time
+    composite.close()
+
+
+def file_timestamp(d: dt) -> str:
+    """
+    Formats a datetime for output file names (YYYY-MM-DD_HH-MM-SS).
+    Much faster than strftime, which matters once per exported image.
+    """
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}_{d.hour:02d}-{d.minute:02d}-{d.second:02d}"
+
+
+def exif_timestamp(d: dt) -> str:
+    """
+    Formats a datetime for EXIF date tags (YYYY:MM:DD HH:MM:SS).
+    """
+    return f"{d.year:04d}:{d.month:02d}:{d.day:02d} {d.hour:02d}:{d.minute:02d}:{d.second:02d}"
+
+
+@lru_cache(maxsize=4096)
+def timezone_at(tf: TimezoneFinder, lat: float, lng: float):
+    """
+    Cached timezone lookup. Callers round coordinates to 2 decimals (about 1 km),
+    so photos taken around the same place share a single polygon search.
+    """
+    return tf.timezone_at(lat=lat, lng=lng)
+
+
+class SelectionRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the web UI page and its two images, and receives the user's choice.
+    """
+
+    def do_GET(self):
+        if self.path.startswith("/img/"):
+            self.send_image()
+            return
+        if self.path != "/" or self.server.page is None:
+            self.send_error(404)
+            return
+        body = self.server.page.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_image(self):
+        # Paths look like /img/<token>/<index>, the token only keeps browsers from caching
+        try:
+            img_path = self.server.images[int(self.path.rsplit("/", 1)[1])]
+            img_file = open(img_path, "rb")
+        except (ValueError, IndexError, OSError):
+            self.send_error(404)
+            return
+        with img_file:
+            content_type = "image/jpeg" if img_path.lower().endswith((".jpg", ".jpeg")) else "image/webp"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(os.fstat(img_file.fileno()).st_size))
+            self.end_headers()
+            copyfileobj(img_file, self.wfile)
+
+    def do_POST(self):
+        if self.path != "/select":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        token, _, value = self.rfile.read(length).decode("utf-8").partition(":")
+        self.server.submit_selection(token, value.strip())
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        # Keep request logs from messing up the progress bars
+        pass
+
+
+class SelectionServer(ThreadingHTTPServer):
+    """
+    Local HTTP server for the web UI. Each page gets a token so that a late click
+    in an old browser tab can't answer a newer question.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SelectionRequestHandler)
+        self.page = None
+        self.images = []
+        self._token = 0
+        self._selection = None
+        self._selection_made = threading.Event()
+        self._lock = threading.Lock()
+
+    def new_selection(self) -> int:
+        with self._lock:
+            self._token += 1
+            self._selection = None
+            self._selection_made.clear()
+            return self._token
+
+    def submit_selection(self, token: str, value: str):
+        with self._lock:
+            if token == str(self._token) and not self._selection_made.is_set():
+                self._selection = value
+                self._selection_made.set()
+
+    def wait_for_selection(self, timeout: float):
+        """
+        Blocks until the browser posts a selection, returns None on timeout.
+        """
+        if not self._selection_made.wait(timeout):
+            return None
+        return self._selection
+
+
+class BatchExifWriter:
+    """
+    Collects metadata writes and sends them to ExifTool in batches. Each batch is
+    written to an argfile with one -execute per image, so ExifTool handles the whole
+    batch in a single round-trip instead of one per image.
+    Full batches are written by a background thread, so the export workers keep
+    copying and compositing while ExifTool runs.
+    """
+
+    batch_size = 200
+    # Full batches waiting for the writer thread, blocks the workers if ExifTool falls behind
+    max_queued_batches = 4
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self._pending = []
+        self._lock = threading.Lock()
+        self._batches = Queue(maxsize=self.max_queued_batches)
+        self._thread = None
+
+    def queue(self, img_name: str, tags: dict, params: list, on_error):
+        """
+        Queues a write. `on_error` is called without arguments if it fails.
+        """
+        with self._lock:
+            self._pending.append((img_name, tags, params, on_error))
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self._submit(batch)
+
+    def flush(self):
+        """
+        Writes everything that is still queued and waits until all writes are done.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._submit(batch)
+        self._batches.join()
+
+    def close(self):
+        """
+        Flushes and stops the writer thread.
+        """
+        self.flush()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._batches.put(None)
+            thread.join()
+
+    def _submit(self, batch):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._batches.put(batch)
+
+    def _run(self):
+        while True:
+            batch = self._batches.get()
+            try:
+                if batch is None:
+                    return
+                self._write(batch)
+            except Exception as e:
+                print(f"Error writing metadata: {e}")
+            finally:
+                self._batches.task_done()
+
+    def _write(self, batch):
+        with tempfile.NamedTemporaryFile("w", suffix=".args", encoding="utf-8", delete=False) as f:
+            for img_name, tags, params, _ in batch:
+                for param in params:
+                    f.write(f"{param}\n")
+                for tag, value in tags.items():
+                    f.write(f"-{tag}={value}\n")
+                f.write(f"{img_name}\n-execute\n")
+            argfile = f.name
+
+        try:
+            errors = self.exporter.execute_argfile(argfile)
+            # ExifTool ends its error messages with the file name, e.g. "Error: File not found - a.webp"
+            error_lines = [line for line in errors.splitlines() if line.startswith("Error")]
+            failed_paths = {line.rsplit(" - ", 1)[1].strip() for line in error_lines if " - " in line}
+            failed = [item for item in batch if item[0] in failed_paths]
+            if error_lines and not failed:
+                # Retry everything if the failed files can't be told apart
+                failed = batch
+        except Exception as e:
+            self.exporter.verbose_msg(f"Batched metadata write failed: {e}")
+            failed = batch
+        finally:
+            os.remove(argfile)
+
+        for img_name, _, _, on_error in failed:
+            try:
+                on_error()
+            except Exception as e:
+                print(f"Error in metadata fallback for {img_name}: {e}")
+
 
 def init_parser() -> argparse.Namespace:
     """
@@ -62,8 +459,26 @@ def init_parser() -> argparse.Namespace:
         "--max-workers",
         dest="max_workers",
         type=int,
+        default=min(32, (os.cpu_count() or 1) * 4),
+        help="Maximum number of parallel workers (default 4 per CPU core, at most 32)",
+    )
+    parser.add_argument(
+        "--keep-format",
+        dest="keep_format",
+        default=False,
+        action="store_true",
+        help="Never re-encode images to JPEG when WEBP metadata can't be written\n"
+        "(only the file modification time is set then)",
+    )
+    parser.add_argument(
+        "--webp-method",
+        dest="webp_method",
+        type=int,
+        choices=range(7),
         default=4,
-        help="Maximum number of parallel workers (default 4)",
+        metavar="{0-6}",
+        help="WEBP encoder effort for composite images (default 4)\n"
+        "0 is fastest, 6 gives the smallest files",
     )
     parser.add_argument(
         "--no-memories",
@@ -140,6 +555,8 @@ class BeRealExporter:
         self.max_workers = args.max_workers
         self.interactive_conversations = args.interactive_conversations
         self.web_ui = args.web_ui
+        self.keep_format = args.keep_format
+        self.webp_method = args.webp_method
         
         # Setup logging for clean progress bars
         if self.verbose:
@@ -148,9 +565,42 @@ class BeRealExporter:
         else:
             self.logger = None
         
+        self.check_pillow_simd()
+
         # Find the BeReal export folder inside input
         self.bereal_path = self.find_bereal_export_folder()
 
+        # Loading the timezone polygon data is expensive, so do it once per run.
+        # Keeping it in memory also avoids shared file reads across worker threads.
+        self._tf = TimezoneFinder(in_memory=True)
+        self._tz_cache = {}
+
+        # One stay_open ExifTool process is shared by all workers, see set_tags()
+        self._et = None
+        self._et_lock = threading.Lock()
+        self.exif_writer = BatchExifWriter(self)
+
+        # Whether ExifTool can write WEBP metadata, see webp_exif_supported()
+        self._webp_exif_ok = None
+        self._webp_exif_lock = threading.Lock()
+
+        # Guards the sets of already exported file names shared by workers
+        self._existing_lock = threading.Lock()
+
+        # File name -> path for the Photos folders, see find_in_photo_folders()
+        self._photo_index = None
+        self._photo_index_lock = threading.Lock()
+
+        # Output folders that are known to exist, see ensure_dir()
+        self._created_dirs = set()
+
+        # Local server for --web-ui, started on first use
+        self._selection_server = None
+
+        # Worker processes for composite rendering, started on first use
+        self._composite_pool = None
+        self._composite_pool_lock = threading.Lock()
+
     @staticmethod
     def init_time_span(args: argparse.Namespace) -> tuple:
         """
@@ -183,23 +633,120 @@ class BeRealExporter:
             raise FileNotFoundError(f"Input path not found: {self.input_path}")
         
         # Look for folders that contain the expected structure
-        for item in os.listdir(self.input_path):
-            item_path = os.path.join(self.input_path, item)
-            if os.path.isdir(item_path):
-                # Check if this folder contains the expected JSON files
-                if (os.path.exists(os.path.join(item_path, "memories.json")) or 
-                    os.path.exists(os.path.join(item_path, "posts.json"))):
-                    return item_path
+        with os.scandir(self.input_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Check if this folder contains the expected JSON files
+                    # Folders like lost+found or $RECYCLE.BIN may not be readable
+                    try:
+                        with os.scandir(entry.path) as children:
+                            names = {child.name for child in children}
+                    except OSError:
+                        continue
+                    if "memories.json" in names or "posts.json" in names:
+                        return entry.path
         
         raise FileNotFoundError("No BeReal export folder found in input directory")
 
-    def verbose_msg(self, msg: str):
+    def check_pillow_simd(self):
+        """
+        Suggests Pillow-SIMD on x86 machines, where it speeds up resizing and compositing.
+        Pillow-SIMD releases are tagged with a .postN version suffix.
+        """
+        if platform.machine().lower() in ("x86_64", "amd64") and ".post" not in PIL.__version__:
+            self.verbose_msg(
+                f"Using stock Pillow {PIL.__version__}; installing pillow-simd can make composites a lot faster"
+            )
+
+    def get_exiftool(self):
+        """
+        Returns the single long-running ExifTool process, starting it on first use.
+        Starting exiftool is slow, so it's kept open for the whole run.
+        Callers must hold self._et_lock since it talks over one pipe.
+        """
+        if self._et is None:
+            self._et = et(executable=self.exiftool_path) if self.exiftool_path else et()
+        return self._et
+
+    def set_tags(self, img_name: str, tags: dict, params: list):
+        """
+        Writes metadata to a single file through the shared ExifTool process.
+        """
+        with self._et_lock:
+            return self.get_exiftool().set_tags(img_name, tags=tags, params=params)
+
+    def execute_argfile(self, argfile: str) -> str:
+        """
+        Runs all commands of an ExifTool argfile and returns what ExifTool wrote to stderr.
+        Failed commands don't raise, the caller finds them in the returned errors.
+        """
+        with self._et_lock:
+            exif_tool = self.get_exiftool()
+            check_execute = exif_tool.check_execute
+            exif_tool.check_execute = False
+            try:
+                exif_tool.execute("-@", argfile)
+            finally:
+                exif_tool.check_execute = check_execute
+            return exif_tool.last_stderr
+
+    def webp_exif_supported(self) -> bool:
+        """
+        Checks once, with a small test file, whether ExifTool can write metadata to WEBP files.
+        Older versions can't, then the write attempts are skipped instead of failing for every image.
+        """
+        with self._webp_exif_lock:
+            if self._webp_exif_ok is None:
+                # A probe file that can't be written counts as unsupported too
+                try:
+                    with tempfile.TemporaryDirectory() as probe_dir:
+                        probe_path = os.path.join(probe_dir, "probe.webp")
+                        Image.new('RGB', (16, 16)).save(probe_path, "WEBP")
+                        self.set_tags(
+                            probe_path,
+                            tags={"DateTimeOriginal": "2000:01:01 00:00:00"},
+                            params=["-overwrite_original", "-m", "-q"],
+                        )
+                    self._webp_exif_ok = True
+                except Exception:
+                    self._webp_exif_ok = False
+                if not self._webp_exif_ok:
+                    print("ExifTool can't write WEBP metadata, WEBP images get the fallback handling")
+            return self._webp_exif_ok
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Writes pending metadata, then stops the shared ExifTool process, the web UI server
+        and the composite worker processes.
+        """
+        self.exif_writer.close()
+        with self._et_lock:
+            if self._et is not None:
+                if self._et.running:
+                    self._et.terminate()
+                self._et = None
+        if self._selection_server is not None:
+            self._selection_server.shutdown()
+            self._selection_server.server_close()
+            self._selection_server = None
+        if self._composite_pool is not None:
+            self._composite_pool.shutdown()
+            self._composite_pool = None
+
+    def verbose_msg(self, msg: str, *args):
         """
         Prints an explanation of what is being done to the terminal.
         Uses logging to work nicely with progress bars.
+        `args` are %-formatted into `msg` only when verbose output is on.
         """
         if self.verbose and self.logger:
-            self.logger.info(msg)
+            self.logger.info(msg, *args)
 
     def convert_to_local_time(self, utc_dt: dt, location=None) -> dt:
         """
@@ -217,13 +764,15 @@ class BeRealExporter:
         # Try to get timezone from location if available
         if location and "latitude" in location and "longitude" in location:
             try:
-                tf = TimezoneFinder()
-                timezone_str = tf.timezone_at(
-                    lat=location["latitude"], 
-                    lng=location["longitude"]
+                timezone_str = timezone_at(
+                    self._tf,
+                    round(location["latitude"], 2),
+                    round(location["longitude"], 2),
                 )
                 if timezone_str:
-                    local_tz = pytz.timezone(timezone_str)
+                    local_tz = self._tz_cache.get(timezone_str)
+                    if local_tz is None:
+                        local_tz = self._tz_cache[timezone_str] = pytz.timezone(timezone_str)
                     self.verbose_msg(f"Using timezone {timezone_str} from GPS location")
                 else:
                     self.verbose_msg("GPS location found but timezone lookup failed, using America/New_York")
@@ -236,15 +785,13 @@ class BeRealExporter:
         local_dt = utc_dt.astimezone(local_tz)
         return local_dt.replace(tzinfo=None)
 
-    def process_memory(self, memory, out_path_memories):
+    def process_memory(self, memory, memory_dt, out_path_memories, existing):
         """
         Processes a single memory (for parallel execution).
         Saves to posts folder and skips if files already exist to avoid duplicates.
+        `memory_dt` is the parsed takenTime, already checked against the time span.
+        `existing` is the set of file names already in the output folder.
         """
-        memory_dt = self.get_datetime_from_str(memory["takenTime"])
-        if not (self.time_span[0] <= memory_dt <= self.time_span[1]):
-            return None
-
         # Get front and back image paths
         front_path = os.path.join(self.bereal_path, memory["frontImage"]["path"])
         back_path = os.path.join(self.bereal_path, memory["backImage"]["path"])
@@ -254,36 +801,90 @@ class BeRealExporter:
         local_dt = self.convert_to_local_time(memory_dt, img_location)
         
         # Create output filenames with descriptive names
-        base_filename = f"{local_dt.strftime('%Y-%m-%d_%H-%M-%S')}"
-        secondary_output = f"{out_path_memories}/{base_filename}_selfie-view.webp"  # front camera
-        primary_output = f"{out_path_memories}/{base_filename}_main-view.webp"     # back camera
-        composite_output = f"{out_path_memories}/{base_filename}_composited.webp"
+        base_filename = file_timestamp(local_dt)
+        secondary_name = base_filename + "_selfie-view.webp"  # front camera
+        primary_name = base_filename + "_main-view.webp"     # back camera
+        composite_name = base_filename + "_composited.webp"
+        out_prefix = out_path_memories + "/"
+        secondary_output = out_prefix + secondary_name
+        primary_output = out_prefix + primary_name
+        composite_output = out_prefix + composite_name
         
         # Skip if files already exist (avoid duplicates from posts)
-        if os.path.exists(primary_output) and os.path.exists(secondary_output) and os.path.exists(composite_output):
+        if primary_name in existing and secondary_name in existing and composite_name in existing:
             self.verbose_msg(f"Skipping {base_filename} - already exists from posts export")
             return f"{base_filename} (skipped - duplicate)"
         
         # Export individual images (front=secondary, back=primary)
-        if not os.path.exists(secondary_output):
-            self.export_img(front_path, secondary_output, memory_dt, img_location)
-        if not os.path.exists(primary_output):
-            self.export_img(back_path, primary_output, memory_dt, img_location)
+        if secondary_name not in existing:
+            self.mark_exported(existing, self.export_img(front_path, secondary_output, memory_dt, img_location, local_dt))
+        if primary_name not in existing:
+            self.mark_exported(existing, self.export_img(back_path, primary_output, memory_dt, img_location, local_dt))
         
         # Create composite image (back/primary as background, front/secondary as overlay - BeReal style)
-        if not os.path.exists(composite_output) and os.path.exists(secondary_output) and os.path.exists(primary_output):
-            self.create_composite_image(primary_output, secondary_output, composite_output, memory_dt, img_location)
+        if composite_name not in existing and secondary_name in existing and primary_name in existing:
+            self.create_composite_image(primary_output, secondary_output, composite_output, memory_dt, img_location, local_dt)
 
         return base_filename
 
-    def process_post(self, post, out_path_posts):
+    def process_realmoji(self, realmoji, realmoji_dt, out_path_realmojis, local_dt: dt = None):
         """
-        Processes a single post (for parallel execution).
+        Processes a single realmoji (for parallel execution).
+        `realmoji_dt` is the parsed postedAt, already checked against the time span.
+        Pass `local_dt` if its local time is already known.
         """
-        post_dt = self.get_datetime_from_str(post["takenAt"])
-        if not (self.time_span[0] <= post_dt <= self.time_span[1]):
-            return None
+        # Convert to local time for filename (to match EXIF metadata)
+        if local_dt is None:
+            local_dt = self.convert_to_local_time(realmoji_dt, None)
+        base_filename = file_timestamp(local_dt)
+
+        img_name = f"{out_path_realmojis}/{base_filename}.webp"
+        old_img_name = os.path.join(
+            self.bereal_path,
+            realmoji["media"]["path"],
+        )
+        self.export_img(old_img_name, img_name, realmoji_dt, None, local_dt)
+
+        return base_filename
 
+    @staticmethod
+    def find_existing(existing, img_name):
+        """
+        Returns the name under which `img_name` is in the `existing` file names, or None.
+        WEBP images may have been saved as JPEG instead, see export_img().
+        """
+        if img_name in existing:
+            return img_name
+        if img_name.endswith('.webp'):
+            jpeg_name = img_name[:-5] + '.jpg'
+            if jpeg_name in existing:
+                return jpeg_name
+        return None
+
+    def ensure_dir(self, path: str):
+        """
+        Creates a folder if needed. Remembers the folders it made sure of,
+        so exporting into the same folder again costs no system call.
+        """
+        if path not in self._created_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._created_dirs.add(path)
+
+    def mark_exported(self, existing, img_name):
+        """
+        Records an exported file in the `existing` set shared by the worker threads.
+        """
+        if img_name:
+            with self._existing_lock:
+                existing.add(os.path.basename(img_name))
+
+    def process_post(self, post, post_dt, out_path_posts, existing):
+        """
+        Processes a single post (for parallel execution).
+        Skips files that already exist, e.g. from the memories export.
+        `post_dt` is the parsed takenAt, already checked against the time span.
+        `existing` is the set of file names already in the output folder.
+        """
         # Get primary and secondary image paths
         primary_path = os.path.join(self.bereal_path, post["primary"]["path"])
         secondary_path = os.path.join(self.bereal_path, post["secondary"]["path"])
@@ -293,24 +894,32 @@ class BeRealExporter:
         local_dt = self.convert_to_local_time(post_dt, post_location)
         
         # Create output filename
-        base_filename = f"{local_dt.strftime('%Y-%m-%d_%H-%M-%S')}"
+        base_filename = file_timestamp(local_dt)
         
         # Export individual images
-        primary_output = f"{out_path_posts}/{base_filename}_main-view.webp"
-        secondary_output = f"{out_path_posts}/{base_filename}_selfie-view.webp"
-        composite_output = f"{out_path_posts}/{base_filename}_composited.webp"
+        primary_name = base_filename + "_main-view.webp"
+        secondary_name = base_filename + "_selfie-view.webp"
+        composite_name = base_filename + "_composited.webp"
+        out_prefix = out_path_posts + "/"
+        primary_output = out_prefix + primary_name
+        secondary_output = out_prefix + secondary_name
+        composite_output = out_prefix + composite_name
         
-
+        if primary_name in existing and secondary_name in existing and composite_name in existing:
+            self.verbose_msg(f"Skipping {base_filename} - already exists from memories export")
+            return f"{base_filename} (skipped - duplicate)"
         
         # Export primary image
-        self.export_img(primary_path, primary_output, post_dt, post_location)
+        if primary_name not in existing:
+            self.mark_exported(existing, self.export_img(primary_path, primary_output, post_dt, post_location, local_dt))
         
         # Export secondary image  
-        self.export_img(secondary_path, secondary_output, post_dt, post_location)
+        if secondary_name not in existing:
+            self.mark_exported(existing, self.export_img(secondary_path, secondary_output, post_dt, post_location, local_dt))
         
         # Create composite image
-        if os.path.exists(primary_output) and os.path.exists(secondary_output):
-            self.create_composite_image(primary_output, secondary_output, composite_output, post_dt, post_location)
+        if composite_name not in existing and primary_name in existing and secondary_name in existing:
+            self.create_composite_image(primary_output, secondary_output, composite_output, post_dt, post_location, local_dt)
 
         return base_filename
 
@@ -328,13 +937,10 @@ class BeRealExporter:
         
         # Show image info
         try:
-            from PIL import Image
-            img1 = Image.open(exported_files[0])
-            img2 = Image.open(exported_files[1])
-            print(f"Image 1: {os.path.basename(exported_files[0])} ({img1.width}x{img1.height}, {img1.width/img1.height:.2f} ratio)")
-            print(f"Image 2: {os.path.basename(exported_files[1])} ({img2.width}x{img2.height}, {img2.width/img2.height:.2f} ratio)")
-            img1.close()
-            img2.close()
+            w1, h1 = self.get_image_size(exported_files[0])
+            w2, h2 = self.get_image_size(exported_files[1])
+            print(f"Image 1: {os.path.basename(exported_files[0])} ({w1}x{h1}, {w1/h1:.2f} ratio)")
+            print(f"Image 2: {os.path.basename(exported_files[1])} ({w2}x{h2}, {w2/h2:.2f} ratio)")
         except Exception:
             print(f"Image 1: {os.path.basename(exported_files[0])}")
             print(f"Image 2: {os.path.basename(exported_files[1])}")
@@ -386,30 +992,18 @@ class BeRealExporter:
     def web_ui_choose_primary_overlay(self, exported_files, conversation_id, file_id, progress_info=None):
         """
         Web UI mode to let user choose which image is selfie view.
-        Creates a simple HTML page with side-by-side images.
+        Serves a simple HTML page with side-by-side images from a local HTTP server
+        and waits for the browser to post the selection back.
         """
         if len(exported_files) != 2:
             return exported_files[0], exported_files[1] if len(exported_files) > 1 else exported_files[0]
         
-        import tempfile
         import webbrowser
-        import base64
+
+        server = self.get_selection_server()
+        token = server.new_selection()
         
-        # Create temporary HTML file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
-            # Convert images to base64 for embedding
-            img1_b64 = ""
-            img2_b64 = ""
-            try:
-                with open(exported_files[0], 'rb') as img_file:
-                    img1_b64 = base64.b64encode(img_file.read()).decode()
-                with open(exported_files[1], 'rb') as img_file:
-                    img2_b64 = base64.b64encode(img_file.read()).decode()
-            except Exception as e:
-                print(f"Error reading images: {e}")
-                return self.interactive_choose_primary_overlay([], exported_files, conversation_id, file_id)
-            
-            html_content = f"""
+        html_content = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -450,12 +1044,12 @@ class BeRealExporter:
         
         <div class="images">
             <div class="image-container" id="img1" onclick="selectImage(1)">
-                <img src="data:image/webp;base64,{img1_b64}" alt="Image 1">
+                <img src="/img/{token}/0" alt="Image 1">
                 <h3>Image 1</h3>
                 <p>{os.path.basename(exported_files[0])}</p>
             </div>
             <div class="image-container" id="img2" onclick="selectImage(2)">
-                <img src="data:image/webp;base64,{img2_b64}" alt="Image 2">
+                <img src="/img/{token}/1" alt="Image 2">
                 <h3>Image 2</h3>
                 <p>{os.path.basename(exported_files[1])}</p>
             </div>
@@ -492,17 +1086,8 @@ class BeRealExporter:
         }}
         
         function writeResult(value) {{
-            // Use a simple approach - create a temporary anchor to trigger download
-            const blob = new Blob([value], {{type: 'text/plain'}});
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = 'bereal_selection.txt';
-            a.style.display = 'none';
-            document.body.appendChild(a);
-            a.click();
-            document.body.removeChild(a);
-            URL.revokeObjectURL(url);
+            // Send the choice back to the exporter's local server
+            fetch('/select', {{method: 'POST', body: '{token}:' + value}});
         }}
         
         // Add keyboard shortcuts
@@ -532,96 +1117,75 @@ class BeRealExporter:
     </script>
 </body>
 </html>
-            """
-            
-            f.write(html_content)
-            html_path = f.name
+        """
         
         # Open in browser
         print(f"Opening web UI for conversation {conversation_id}, message {file_id}...")
-        webbrowser.open('file://' + html_path)
+        server.images = list(exported_files)
+        server.page = html_content
+        webbrowser.open(f"http://127.0.0.1:{server.server_address[1]}/")
         
         # Wait for user to make selection in browser
         print("Make your selection in the web browser (click image or press 1/2/S)...")
         
-        import time
-        selection = None
         timeout = 300  # 5 minutes timeout
-        start_time = time.time()
-        
-        # Look for result file in Downloads folder or current directory
-        possible_result_files = [
-            os.path.expanduser("~/Downloads/bereal_selection.txt"),
-            "bereal_selection.txt",
-            os.path.expanduser("~/Downloads/bereal_selection*.txt")
-        ]
-        
-        while selection is None and (time.time() - start_time) < timeout:
-            try:
-                # Check for result files
-                for pattern in possible_result_files:
-                    if '*' in pattern:
-                        import glob
-                        files = glob.glob(pattern)
-                        if files:
-                            result_file = max(files, key=os.path.getctime)  # Get newest
-                        else:
-                            continue
-                    else:
-                        result_file = pattern
-                        if not os.path.exists(result_file):
-                            continue
-                    
-                    # Read the result
-                    try:
-                        with open(result_file, 'r') as f:
-                            result = f.read().strip()
-                            if result == "1":
-                                selection = 1
-                            elif result == "2":
-                                selection = 2
-                            elif result == "skip":
-                                selection = "skip"
-                            
-                            # Clean up the result file
-                            os.unlink(result_file)
-                            break
-                    except Exception:
-                        continue
-                
-                if selection is not None:
-                    break
-                    
-                # Small delay to avoid busy waiting
-                time.sleep(1)
-                
-            except (KeyboardInterrupt, EOFError):
-                print("\nSkipping composite creation...")
-                selection = "skip"
-                break
-        
-        if selection is None:
-            print("Timeout waiting for selection, skipping...")
-            selection = "skip"
-        
-        # Clean up
         try:
-            os.unlink(html_path)
-        except:
-            pass
+            result = server.wait_for_selection(timeout)
+        except (KeyboardInterrupt, EOFError):
+            print("\nSkipping composite creation...")
+            return None, None
         
-        if selection == "skip":
+        if result is None:
+            print("Timeout waiting for selection, skipping...")
             return None, None
-        elif selection == 1:
+        elif result == "1":
             return exported_files[1], exported_files[0]  # img2 main, img1 selfie
-        elif selection == 2:
+        elif result == "2":
             return exported_files[0], exported_files[1]  # img1 main, img2 selfie
-        
-        # Clean up
-        try:
-            os.unlink(html_path)
-        except:
-            pass
+        return None, None
+
+    def get_composite_pool(self) -> ProcessPoolExecutor:
+        """
+        Returns the process pool for composite rendering, starting it on first use.
+        Processes instead of threads let the resize, paste and WEBP encode use all cores.
+        The workers are spawned, forking would copy the ExifTool and web UI threads' locks.
+        """
+        with self._composite_pool_lock:
+            if self._composite_pool is None:
+                self._composite_pool = ProcessPoolExecutor(
+                    # Windows doesn't allow more than 61 worker processes
+                    max_workers=min(61, os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._composite_pool
+
+    def reset_composite_pool(self, pool: ProcessPoolExecutor):
+        """
+        Drops a composite pool whose worker died, so the next render starts a new one.
+        """
+        with self._composite_pool_lock:
+            if self._composite_pool is not pool:
+                # Already replaced by another failed render
+                return
+            self._composite_pool = None
+        print("WARNING: A composite worker process crashed, restarting the composite pool")
+        pool.shutdown(wait=False)
+
+    def check_composite_render(self, pool: ProcessPoolExecutor, render):
+        """
+        Done callback of composite renders, restarts the pool if the render broke it.
+        """
+        if not render.cancelled() and isinstance(render.exception(), BrokenProcessPool):
+            self.reset_composite_pool(pool)
+
+    def get_selection_server(self):
+        """
+        Starts the local web UI server on first use and reuses it for the rest of the run.
+        """
+        if self._selection_server is None:
+            self._selection_server = SelectionServer()
+            threading.Thread(target=self._selection_server.serve_forever, daemon=True).start()
+        return self._selection_server
 
     def detect_primary_overlay_conversation(self, original_files, exported_files):
         """
@@ -635,29 +1199,34 @@ class BeRealExporter:
         file1_name = os.path.basename(original_files[0]).lower()
         file2_name = os.path.basename(original_files[1]).lower()
         
-        # Pattern 1: Look for "secondary" keyword (usually front camera)
-        if "secondary" in file1_name and "secondary" not in file2_name:
-            # file1 is secondary (front), file2 is primary (back)
-            return exported_files[1], exported_files[0]
-        elif "secondary" in file2_name and "secondary" not in file1_name:
-            # file2 is secondary (front), file1 is primary (back)
-            return exported_files[0], exported_files[1]
+        # Look up all camera keywords in one pass per filename
+        roles1 = set(CAMERA_ROLE_RE.findall(file1_name))
+        roles2 = set(CAMERA_ROLE_RE.findall(file2_name))
         
-        # Pattern 2: Look for "front" vs "back" keywords
-        if "front" in file1_name and "back" in file2_name:
-            return exported_files[1], exported_files[0]  # back primary, front overlay
-        elif "back" in file1_name and "front" in file2_name:
-            return exported_files[0], exported_files[1]  # back primary, front overlay
+        if roles1 or roles2:
+            # Pattern 1: Look for "secondary" keyword (usually front camera)
+            if "secondary" in roles1 and "secondary" not in roles2:
+                # file1 is secondary (front), file2 is primary (back)
+                return exported_files[1], exported_files[0]
+            elif "secondary" in roles2 and "secondary" not in roles1:
+                # file2 is secondary (front), file1 is primary (back)
+                return exported_files[0], exported_files[1]
+            
+            # Pattern 2: Look for "front" vs "back" keywords
+            if "front" in roles1 and "back" in roles2:
+                return exported_files[1], exported_files[0]  # back primary, front overlay
+            elif "back" in roles1 and "front" in roles2:
+                return exported_files[0], exported_files[1]  # back primary, front overlay
         
         # Pattern 3: Check image dimensions (front camera often different aspect ratio)
         try:
-            from PIL import Image
-            img1 = Image.open(exported_files[0])
-            img2 = Image.open(exported_files[1])
+            # Only the headers are read here
+            width1, height1 = self.get_image_size(exported_files[0])
+            width2, height2 = self.get_image_size(exported_files[1])
             
             # If one image is significantly smaller or different aspect ratio, it might be front camera
-            ratio1 = img1.width / img1.height
-            ratio2 = img2.width / img2.height
+            ratio1 = width1 / height1
+            ratio2 = width2 / height2
             
             # If aspect ratios are very different, assume the more square one is front camera
             if abs(ratio1 - ratio2) > 0.2:
@@ -665,9 +1234,6 @@ class BeRealExporter:
                     return exported_files[1], exported_files[0]  # img2 primary, img1 overlay
                 else:
                     return exported_files[0], exported_files[1]  # img1 primary, img2 overlay
-            
-            img1.close()
-            img2.close()
         except Exception:
             pass
         
@@ -677,6 +1243,14 @@ class BeRealExporter:
         else:
             return exported_files[1], exported_files[0]  # second alphabetically as primary
 
+    @staticmethod
+    def get_image_size(img_path: str) -> tuple:
+        """
+        Returns (width, height) of an image. Only the file header is read, no pixel data is decoded.
+        """
+        with Image.open(img_path) as img:
+            return img.size
+
     @staticmethod
     def get_img_filename(image: dict) -> str:
         """
@@ -689,6 +1263,13 @@ class BeRealExporter:
         """
         Returns a datetime object from a time key.
         """
+        # BeReal uses ISO 8601 UTC timestamps, which fromisoformat parses much faster than strptime
+        if isinstance(time, str) and time.endswith("Z") and "T" in time:
+            try:
+                return dt.fromisoformat(time[:-1])
+            except ValueError:
+                pass
+
         formats = [
             "%Y-%m-%dT%H:%M:%S.%fZ",  # With microseconds
             "%Y-%m-%dT%H:%M:%S.000Z",  # Without microseconds
@@ -710,9 +1291,69 @@ class BeRealExporter:
             
         raise ValueError(f"Invalid datetime format: {time}")
 
+    def find_in_photo_folders(self, filename: str):
+        """
+        Looks up a photo by file name in the Photos/post, Photos/bereal and Photos/realmoji
+        folders of the export. The folders are listed once, on first use.
+        """
+        with self._photo_index_lock:
+            if self._photo_index is None:
+                photo_index = {}
+                for folder in ("Photos/post", "Photos/bereal", "Photos/realmoji"):
+                    try:
+                        with os.scandir(os.path.join(self.bereal_path, folder)) as entries:
+                            for entry in entries:
+                                # Earlier folders win, like the order of the old fallback checks
+                                photo_index.setdefault(entry.name, entry.path)
+                    except OSError:
+                        continue
+                self._photo_index = photo_index
+        return self._photo_index.get(filename)
+
+    @staticmethod
+    def build_tags(local_dt: dt, img_location=None, all_dates: bool = True, gps_refs: bool = True) -> dict:
+        """
+        Builds the EXIF date and GPS tags for an image.
+        With all_dates=False only DateTimeOriginal is set, which more formats support.
+        """
+        date_str = exif_timestamp(local_dt)
+        if all_dates:
+            tags = {"DateTimeOriginal": date_str, "CreateDate": date_str, "ModifyDate": date_str}
+        else:
+            tags = {"DateTimeOriginal": date_str}
+        if img_location:
+            tags["GPSLatitude"] = img_location["latitude"]
+            tags["GPSLongitude"] = img_location["longitude"]
+            if gps_refs:
+                tags["GPSLatitudeRef"] = "N" if img_location["latitude"] >= 0 else "S"
+                tags["GPSLongitudeRef"] = "E" if img_location["longitude"] >= 0 else "W"
+        return tags
+
+    @staticmethod
+    def tags_differ_condition(tags: dict) -> str:
+        """
+        Builds an ExifTool -if expression that is true unless the file already has the
+        DateTimeOriginal and GPS position from `tags` (to the second and about a meter).
+        """
+        conditions = [f"not $DateTimeOriginal or $DateTimeOriginal ne '{tags['DateTimeOriginal']}'"]
+        for tag in ("GPSLatitude", "GPSLongitude"):
+            if tag in tags:
+                # EXIF stores the unsigned value, the sign is in the Ref tag
+                conditions.append(f"not ${tag} or abs(${tag}# - {abs(tags[tag])}) > 0.00001")
+                ref = tag + "Ref"
+                if ref in tags:
+                    conditions.append(f"not ${ref}# or ${ref}# ne '{tags[ref]}'")
+        return " or ".join(conditions)
+
     def export_img(
-        self, old_img_name: str, img_name: str, img_dt: dt, img_location=None
+        self, old_img_name: str, img_name: str, img_dt: dt, img_location=None, local_dt: dt = None
     ):
+        """
+        Copies an image to the output and writes its metadata.
+        Pass `local_dt` if the local time of `img_dt` is already known.
+        Returns the path of the exported file (the extension may have been corrected),
+        or None if the source image wasn't found. The metadata is queued on self.exif_writer.
+        """
         self.verbose_msg(f"Exporting {old_img_name} to {img_name}")
         if img_location:
             self.verbose_msg(f"Location data available: {img_location['latitude']}, {img_location['longitude']}")
@@ -721,433 +1362,316 @@ class BeRealExporter:
 
         if not os.path.isfile(old_img_name):
             # Try different fallback locations
-            fallback_locations = [
+            direct_path = os.path.join(self.bereal_path, old_img_name.lstrip("/"))
+            original_path = os.path.join(self.bereal_path, old_img_name)
+            if os.path.isfile(direct_path):
                 # Direct path from bereal_path
-                os.path.join(self.bereal_path, old_img_name.lstrip("/")),
-                # Try with just the filename in different folders
-                os.path.join(self.bereal_path, "Photos/post", os.path.basename(old_img_name)),
-                os.path.join(self.bereal_path, "Photos/bereal", os.path.basename(old_img_name)),
-                os.path.join(self.bereal_path, "Photos/realmoji", os.path.basename(old_img_name)),
+                old_img_name = direct_path
+            elif (indexed_path := self.find_in_photo_folders(os.path.basename(old_img_name))):
+                # Just the filename in one of the Photos folders
+                old_img_name = indexed_path
+            elif os.path.isfile(original_path):
                 # Original fallback
-                os.path.join(self.bereal_path, old_img_name)
-            ]
-            
-            for fallback in fallback_locations:
-                if os.path.isfile(fallback):
-                    old_img_name = fallback
-                    break
+                old_img_name = original_path
             else:
                 print(f"File not found in expected locations: {old_img_name}")
-                return
+                return None
 
-        os.makedirs(os.path.dirname(img_name), exist_ok=True)
+        self.ensure_dir(os.path.dirname(img_name))
         
         # Detect actual file format and adjust extension accordingly
         try:
-            with Image.open(old_img_name) as img:
-                actual_format = img.format.lower()
-                self.verbose_msg(f"Detected format: {actual_format} for {old_img_name}")
-                
-                if actual_format == 'jpeg' and img_name.endswith('.webp'):
-                    # Original is JPEG but we're naming it .webp - fix the extension
-                    img_name = img_name.replace('.webp', '.jpg')
-                    self.verbose_msg(f"Corrected extension to .jpg for JPEG file: {img_name}")
-                elif actual_format == 'webp' and img_name.endswith('.jpg'):
-                    # Original is WEBP but we're naming it .jpg - fix the extension  
-                    img_name = img_name.replace('.jpg', '.webp')
-                    self.verbose_msg(f"Corrected extension to .webp for WEBP file: {img_name}")
-        except Exception as e:
+            actual_format = sniff_format(old_img_name)
+        except OSError as e:
+            actual_format = None
             self.verbose_msg(f"Could not detect format for {old_img_name}: {e}, using original extension")
+        else:
+            self.verbose_msg(f"Detected format: {actual_format} for {old_img_name}")
+        
+        if actual_format == 'jpeg' and img_name.endswith('.webp'):
+            # Original is JPEG but we're naming it .webp - fix the extension
+            img_name = img_name.replace('.webp', '.jpg')
+            self.verbose_msg(f"Corrected extension to .jpg for JPEG file: {img_name}")
+        elif actual_format == 'webp' and img_name.endswith('.jpg'):
+            # Original is WEBP but we're naming it .jpg - fix the extension  
+            img_name = img_name.replace('.jpg', '.webp')
+            self.verbose_msg(f"Corrected extension to .webp for WEBP file: {img_name}")
         
-        cp(old_img_name, img_name)
+        fast_copy(old_img_name, img_name)
 
         # Convert to local time based on location
-        local_dt = self.convert_to_local_time(img_dt, img_location)
+        if local_dt is None:
+            local_dt = self.convert_to_local_time(img_dt, img_location)
         
         # Use appropriate tags based on file format
         if img_name.endswith('.jpg') or img_name.endswith('.jpeg'):
             # JPEG supports full EXIF metadata
-            tags = {
-                "DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                "CreateDate": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                "ModifyDate": local_dt.strftime("%Y:%m:%d %H:%M:%S")
-            }
+            tags = self.build_tags(local_dt, img_location)
             if img_location:
                 self.verbose_msg(f"Adding GPS to JPEG {img_name}: {img_location['latitude']}, {img_location['longitude']}")
-                tags.update({
-                    "GPSLatitude": img_location["latitude"],
-                    "GPSLongitude": img_location["longitude"],
-                    "GPSLatitudeRef": "N" if img_location["latitude"] >= 0 else "S",
-                    "GPSLongitudeRef": "E" if img_location["longitude"] >= 0 else "W",
-                })
         else:
-            # WEBP has limited EXIF support, use minimal essential tags
-            tags = {
-                "DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-            }
-            # Add GPS data if available (WEBP supports basic GPS)
+            # WEBP has limited EXIF support, use minimal essential tags plus basic GPS
+            tags = self.build_tags(local_dt, img_location, all_dates=False)
             if img_location:
                 self.verbose_msg(f"Adding GPS to WEBP {img_name}: {img_location['latitude']}, {img_location['longitude']}")
-                tags.update({
-                    "GPSLatitude": img_location["latitude"],
-                    "GPSLongitude": img_location["longitude"],
-                    "GPSLatitudeRef": "N" if img_location["latitude"] >= 0 else "S",
-                    "GPSLongitudeRef": "E" if img_location["longitude"] >= 0 else "W",
-                })
 
-        try:
-            with (
-                et(executable=self.exiftool_path) if self.exiftool_path else et()
-            ) as exif_tool:
-                result = exif_tool.set_tags(
-                    img_name, tags=tags, params=["-overwrite_original", "-m", "-q", "-overwrite_original_in_place"]
-                )
-                self.verbose_msg(f"ExifTool result: {result}")
-            self.verbose_msg(f"Metadata added to {img_name} (local time: {local_dt.strftime('%Y-%m-%d %H:%M:%S')})")
-        except Exception as e:
+        if img_name.endswith('.webp') and not self.webp_exif_supported():
+            # Writing the tags would fail anyway. The fallback may replace the WEBP with a JPEG,
+            # so return the path it ended up with
+            return self.write_img_metadata_fallback(img_name, local_dt, img_location, try_tags=False)
+
+        # The write is batched with others; if it fails, the fallbacks run when the batch is flushed.
+        # The -if condition makes ExifTool leave the copy alone if the source already has these tags.
+        self.exif_writer.queue(
+            img_name,
+            tags,
+            ["-overwrite_original", "-m", "-q", "-if", self.tags_differ_condition(tags)],
+            partial(self.write_img_metadata_fallback, img_name, local_dt, img_location),
+        )
+        self.verbose_msg(f"Queued metadata for {img_name} (local time: {local_dt.strftime('%Y-%m-%d %H:%M:%S')})")
+
+        return img_name
+
+    def write_img_metadata_fallback(self, img_name: str, local_dt: dt, img_location=None, try_tags: bool = True):
+        """
+        Fallbacks for when the regular metadata write of an exported image failed.
+        With try_tags=False the retry with fewer tags is skipped.
+        Returns the path of the exported file afterwards (the JPEG if the image was converted),
+        or None if it is gone.
+        """
+        if try_tags:
             # WEBP files often have limited EXIF support, try with fewer tags
             self.verbose_msg(f"Primary metadata write failed for {img_name}, trying fallback approach")
             try:
                 # Try with just DateTimeOriginal which is more widely supported
-                fallback_tags = {"DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S")}
-                if img_location:
-                    fallback_tags.update({
-                        "GPSLatitude": img_location["latitude"],
-                        "GPSLongitude": img_location["longitude"],
-                        "GPSLatitudeRef": "N" if img_location["latitude"] >= 0 else "S",
-                        "GPSLongitudeRef": "E" if img_location["longitude"] >= 0 else "W",
-                    })
-                
-                with (
-                    et(executable=self.exiftool_path) if self.exiftool_path else et()
-                ) as exif_tool:
-                    result = exif_tool.set_tags(
-                        img_name, tags=fallback_tags, params=["-overwrite_original", "-m", "-q"]
-                    )
+                fallback_tags = self.build_tags(local_dt, img_location, all_dates=False)
+            
+                self.set_tags(
+                    img_name, tags=fallback_tags, params=["-overwrite_original", "-m", "-q"]
+                )
                 self.verbose_msg(f"Fallback metadata added to {img_name}")
-            except Exception as e2:
-                print(f"WEBP metadata failed for {img_name}, trying JPEG conversion...")
-                # Convert to JPEG as final fallback for reliable EXIF
-                try:
-                    jpeg_name = img_name.replace('.webp', '.jpg')
-                    with Image.open(img_name) as img:
-                        # Convert to RGB if necessary (JPEG doesn't support transparency)
-                        if img.mode in ('RGBA', 'LA', 'P'):
-                            rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                            if img.mode == 'P':
-                                img = img.convert('RGBA')
-                            rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                            img = rgb_img
-                        img.save(jpeg_name, 'JPEG', quality=95, optimize=True)
-                    
-                    # Add EXIF to JPEG (should work reliably)
-                    jpeg_tags = {
-                        "DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                        "CreateDate": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                        "ModifyDate": local_dt.strftime("%Y:%m:%d %H:%M:%S")
-                    }
-                    if img_location:
-                        jpeg_tags.update({
-                            "GPSLatitude": img_location["latitude"],
-                            "GPSLongitude": img_location["longitude"],
-                            "GPSLatitudeRef": "N" if img_location["latitude"] >= 0 else "S",
-                            "GPSLongitudeRef": "E" if img_location["longitude"] >= 0 else "W",
-                        })
-                    
-                    with (
-                        et(executable=self.exiftool_path) if self.exiftool_path else et()
-                    ) as exif_tool:
-                        exif_tool.set_tags(
-                            jpeg_name, tags=jpeg_tags, params=["-overwrite_original"]
-                        )
-                    
-                    # Remove the original WEBP file since JPEG worked
-                    os.remove(img_name)
-                    self.verbose_msg(f"Converted to JPEG with full EXIF: {jpeg_name}")
-                    
-                except Exception as e3:
-                    print(f"JPEG conversion also failed for {img_name}: {e3}")
-                    # Set file modification time as absolute last resort
-                    try:
-                        timestamp = local_dt.timestamp()
-                        os.utime(img_name, (timestamp, timestamp))
-                        self.verbose_msg(f"Set file modification time for {img_name}")
-                    except Exception as e4:
-                        print(f"Could not set any timestamp for {img_name}: {e4}")
+                return img_name
+            except Exception:
+                pass
 
-    def create_rounded_mask(self, size, radius):
+        if self.keep_format:
+            self.set_file_mtime(img_name, local_dt)
+            return img_name
+        else:
+            print(f"WEBP metadata failed for {img_name}, trying JPEG conversion...")
+            # Convert to JPEG as final fallback for reliable EXIF
+            try:
+                jpeg_name = img_name.replace('.webp', '.jpg')
+                with Image.open(img_name) as img:
+                    # Convert to RGB if necessary (JPEG doesn't support transparency)
+                    if img.mode in ('RGBA', 'LA', 'P'):
+                        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+                        if img.mode == 'P':
+                            img = img.convert('RGBA')
+                        rgb_img.paste(img, mask=img.getchannel('A') if 'A' in img.mode else None)
+                        img = rgb_img
+                    img.save(jpeg_name, 'JPEG', quality=95, optimize=True)
+                
+                # Add EXIF to JPEG (should work reliably)
+                jpeg_tags = self.build_tags(local_dt, img_location)
+                
+                self.set_tags(
+                    jpeg_name, tags=jpeg_tags, params=["-overwrite_original"]
+                )
+                
+                # Remove the original WEBP file since JPEG worked
+                os.remove(img_name)
+                self.verbose_msg(f"Converted to JPEG with full EXIF: {jpeg_name}")
+                return jpeg_name
+                
+            except Exception as e3:
+                print(f"JPEG conversion also failed for {img_name}: {e3}")
+                if not os.path.isfile(img_name):
+                    return None
+                # Set file modification time as absolute last resort
+                self.set_file_mtime(img_name, local_dt)
+                return img_name
+
+    def set_file_mtime(self, img_name: str, local_dt: dt):
         """
-        Creates a rounded rectangle mask for the given size and radius with anti-aliasing.
+        Sets the file modification time when no metadata could be written.
         """
-        # Use supersampling for smoother edges (4x resolution)
-        scale = 4
-        large_size = (size[0] * scale, size[1] * scale)
-        large_radius = radius * scale
-        
-        # Create mask at higher resolution
-        mask = Image.new('L', large_size, 0)
-        draw = ImageDraw.Draw(mask)
-        draw.rounded_rectangle((0, 0, large_size[0], large_size[1]), radius=large_radius, fill=255)
-        
-        # Downsample with high-quality resampling for anti-aliasing
-        mask = mask.resize(size, Image.Resampling.LANCZOS)
-        return mask
+        try:
+            timestamp = local_dt.timestamp()
+            os.utime(img_name, (timestamp, timestamp))
+            self.verbose_msg(f"Set file modification time for {img_name}")
+        except Exception as e:
+            print(f"Could not set any timestamp for {img_name}: {e}")
+
+    def submit_composite(self, primary_path: str, secondary_path: str, output_path: str):
+        """
+        Starts rendering a composite image in the process pool and returns its future.
+        """
+        pool = self.get_composite_pool()
+        try:
+            render = pool.submit(render_composite, primary_path, secondary_path, output_path, self.webp_method)
+        except BrokenProcessPool:
+            # The pool broke before the done callbacks noticed, retry once on a new one
+            self.reset_composite_pool(pool)
+            pool = self.get_composite_pool()
+            render = pool.submit(render_composite, primary_path, secondary_path, output_path, self.webp_method)
+        render.add_done_callback(partial(self.check_composite_render, pool))
+        return render
+
+    def create_composite_images(self, composites: list):
+        """
+        Creates several composite images. All renders are submitted before waiting on the first,
+        so they use the whole process pool. `composites` holds create_composite_image() arguments.
+        """
+        renders = []
+        for args in composites:
+            try:
+                renders.append(self.submit_composite(*args[:3]))
+            except Exception as e:
+                print(f"Error starting composite image {args[2]}: {e}")
+                renders.append(None)
+        for args, render in zip(composites, renders):
+            # One failed composite must not stop the rest of the batch
+            try:
+                if render is None:
+                    self.copy_primary_as_composite(*args)
+                else:
+                    self.create_composite_image(*args, render=render)
+            except Exception as e:
+                print(f"Error finishing composite image {args[2]}: {e}")
 
-    def create_composite_image(self, primary_path: str, secondary_path: str, output_path: str, img_dt: dt = None, img_location=None):
+    def create_composite_image(self, primary_path: str, secondary_path: str, output_path: str, img_dt: dt = None, img_location=None, local_dt: dt = None, render=None):
         """
         Creates a composite image with the secondary image overlaid on the primary image
         with padding from the top and left edges and rounded corners.
         Applies the same metadata as the source images.
+        Pass `local_dt` if the local time of `img_dt` is already known, and `render`
+        if the image was already submitted with submit_composite().
         """
+        # Convert to local time based on location
+        if local_dt is None and img_dt:
+            local_dt = self.convert_to_local_time(img_dt, img_location)
+
         try:
-            # Open both images
-            primary = Image.open(primary_path)
-            secondary = Image.open(secondary_path)
-            
-            # Calculate secondary image size (about 1/3 of primary width)
-            secondary_width = primary.width // 3
-            secondary_height = int(secondary.height * (secondary_width / secondary.width))
-            
-            # Resize secondary image
-            secondary_resized = secondary.resize((secondary_width, secondary_height), Image.Resampling.LANCZOS)
-            
-            # Create rounded corners for the secondary image
-            corner_radius = min(secondary_width, secondary_height) // 10  # 10% of the smaller dimension
-            border_width = 4
-            
-            # Create secondary image with border
-            bordered_width = secondary_width + (border_width * 2)
-            bordered_height = secondary_height + (border_width * 2)
-            
-            # Create a black background for the border
-            bordered_image = Image.new('RGBA', (bordered_width, bordered_height), (0, 0, 0, 255))
-            
-            # Create a mask with rounded corners for the bordered image
-            border_mask = self.create_rounded_mask((bordered_width, bordered_height), corner_radius + border_width)
-            
-            # Apply the border mask
-            bordered_image.putalpha(border_mask)
-            
-            # Create a mask with rounded corners for the inner image
-            inner_mask = self.create_rounded_mask((secondary_width, secondary_height), corner_radius)
-            
-            # Apply the mask to create rounded corners on the secondary image
-            secondary_with_alpha = Image.new('RGBA', (secondary_width, secondary_height), (0, 0, 0, 0))
-            secondary_rgba = secondary_resized.convert('RGBA')
-            secondary_with_alpha.paste(secondary_rgba, (0, 0))
-            secondary_with_alpha.putalpha(inner_mask)
-            
-            # Paste the secondary image onto the bordered background
-            bordered_image.paste(secondary_with_alpha, (border_width, border_width), secondary_with_alpha)
-            
-            # Create a copy of the primary image and convert to RGBA for proper alpha blending
-            composite = primary.convert('RGBA')
-            
-            # Add padding (20 pixels from top and left)
-            padding = 20
-            
-            # Paste the bordered secondary image onto the primary with padding
-            composite.paste(bordered_image, (padding, padding), bordered_image)
-            
-            # Convert back to RGB for saving as WEBP
-            final_composite = Image.new('RGB', composite.size, (255, 255, 255))
-            final_composite.paste(composite, mask=composite.split()[-1] if composite.mode == 'RGBA' else None)
-            
-            # Save the composite image
-            final_composite.save(output_path, "WEBP", quality=95)
+            # The pixel work runs in a worker process, Pillow holds the GIL for most of it
+            if render is None:
+                render = self.submit_composite(primary_path, secondary_path, output_path)
+            render.result()
             
             # Apply metadata to composite if datetime is provided
-            if img_dt:
-                # Convert to local time based on location
-                local_dt = self.convert_to_local_time(img_dt, img_location)
-                
-                tags = {
-                    "DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                    "CreateDate": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                    "ModifyDate": local_dt.strftime("%Y:%m:%d %H:%M:%S")
-                }
-                
-                if img_location:
-                    tags.update(
-                        {
-                            "GPSLatitude": img_location["latitude"],
-                            "GPSLongitude": img_location["longitude"],
-                            "GPSLatitudeRef": "N" if img_location["latitude"] >= 0 else "S",
-                            "GPSLongitudeRef": "E" if img_location["longitude"] >= 0 else "W",
-                        }
-                    )
+            if local_dt:
+                if not self.webp_exif_supported():
+                    # Writing the tags would fail anyway
+                    self.write_composite_metadata_fallback(output_path, local_dt, img_location, "composite", try_tags=False)
+                else:
+                    tags = self.build_tags(local_dt, img_location)
 
-                try:
-                    with (
-                        et(executable=self.exiftool_path) if self.exiftool_path else et()
-                    ) as exif_tool:
-                        exif_tool.set_tags(
-                            output_path, tags=tags, params=["-P", "-overwrite_original", "-m"]
-                        )
-                    self.verbose_msg(f"Metadata added to composite: {output_path}")
-                except Exception as e:
-                    # Try fallback approach for composite
-                    try:
-                        fallback_tags = {"DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S")}
-                        if img_location:
-                            fallback_tags.update({
-                                "GPSLatitude": img_location["latitude"],
-                                "GPSLongitude": img_location["longitude"],
-                            })
-                        
-                        with (
-                            et(executable=self.exiftool_path) if self.exiftool_path else et()
-                        ) as exif_tool:
-                            exif_tool.set_tags(
-                                output_path, tags=fallback_tags, params=["-overwrite_original", "-m", "-q"]
-                            )
-                        self.verbose_msg(f"Fallback metadata added to composite: {output_path}")
-                    except Exception as e2:
-                        print(f"WEBP metadata failed for composite {output_path}, trying JPEG conversion...")
-                        # Convert composite to JPEG as fallback
-                        try:
-                            jpeg_path = output_path.replace('.webp', '.jpg')
-                            with Image.open(output_path) as img:
-                                if img.mode in ('RGBA', 'LA', 'P'):
-                                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                                    if img.mode == 'P':
-                                        img = img.convert('RGBA')
-                                    rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                                    img = rgb_img
-                                img.save(jpeg_path, 'JPEG', quality=95, optimize=True)
-                            
-                            # Add full EXIF to JPEG
-                            jpeg_tags = {
-                                "DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                                "CreateDate": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                                "ModifyDate": local_dt.strftime("%Y:%m:%d %H:%M:%S")
-                            }
-                            if img_location:
-                                jpeg_tags.update({
-                                    "GPSLatitude": img_location["latitude"],
-                                    "GPSLongitude": img_location["longitude"],
-                                    "GPSLatitudeRef": "N" if img_location["latitude"] >= 0 else "S",
-                                    "GPSLongitudeRef": "E" if img_location["longitude"] >= 0 else "W",
-                                })
-                            
-                            with (
-                                et(executable=self.exiftool_path) if self.exiftool_path else et()
-                            ) as exif_tool:
-                                exif_tool.set_tags(
-                                    jpeg_path, tags=jpeg_tags, params=["-overwrite_original"]
-                                )
-                            
-                            os.remove(output_path)  # Remove WEBP since JPEG worked
-                            self.verbose_msg(f"Converted composite to JPEG with full EXIF: {jpeg_path}")
-                            
-                        except Exception as e3:
-                            # Set file modification time as absolute last resort
-                            try:
-                                timestamp = local_dt.timestamp()
-                                os.utime(output_path, (timestamp, timestamp))
-                                self.verbose_msg(f"Set file modification time for composite: {output_path}")
-                            except Exception:
-                                pass
+                    self.exif_writer.queue(
+                        output_path,
+                        tags,
+                        ["-P", "-overwrite_original", "-m"],
+                        partial(self.write_composite_metadata_fallback, output_path, local_dt, img_location, "composite"),
+                    )
             
             self.verbose_msg(f"Created composite image with rounded corners: {output_path}")
             
         except Exception as e:
             print(f"Error creating composite image: {e}")
-            # Fallback to just copying the primary image WITH METADATA
-            cp(primary_path, output_path)
+            self.copy_primary_as_composite(primary_path, secondary_path, output_path, img_dt, img_location, local_dt)
+
+    def copy_primary_as_composite(self, primary_path: str, secondary_path: str, output_path: str, img_dt: dt = None, img_location=None, local_dt: dt = None):
+        """
+        Fallback for a failed composite, copies the primary image with metadata instead.
+        Takes the same arguments as create_composite_image().
+        """
+        if local_dt is None and img_dt:
+            local_dt = self.convert_to_local_time(img_dt, img_location)
+
+        try:
+            fast_copy(primary_path, output_path)
+        except OSError as copy_error:
+            print(f"Could not copy primary image as composite {output_path}: {copy_error}")
+            return
+        
+        # Apply metadata to fallback copy if datetime is provided
+        if local_dt:
+            tags = self.build_tags(local_dt, img_location)
+
+            self.exif_writer.queue(
+                output_path,
+                tags,
+                ["-P", "-overwrite_original", "-m"],
+                partial(self.write_composite_metadata_fallback, output_path, local_dt, img_location, "fallback composite"),
+            )
+
+    def write_composite_metadata_fallback(self, output_path: str, local_dt: dt, img_location=None, label="composite", try_tags: bool = True):
+        """
+        Fallbacks for when the regular metadata write of a composite image failed.
+        With try_tags=False the retry with fewer tags is skipped.
+        """
+        if try_tags:
+            # Try fallback approach for composite
+            try:
+                fallback_tags = self.build_tags(local_dt, img_location, all_dates=False, gps_refs=False)
             
-            # Apply metadata to fallback copy if datetime is provided
-            if img_dt:
-                # Convert to local time based on location
-                local_dt = self.convert_to_local_time(img_dt, img_location)
+                self.set_tags(
+                    output_path, tags=fallback_tags, params=["-overwrite_original", "-m", "-q"]
+                )
+                self.verbose_msg(f"Fallback metadata added to {label}: {output_path}")
+                return
+            except Exception:
+                pass
+
+        if self.keep_format:
+            self.set_file_mtime(output_path, local_dt)
+        else:
+            print(f"WEBP metadata failed for {label} {output_path}, trying JPEG conversion...")
+            # Convert to JPEG as fallback
+            try:
+                jpeg_path = output_path.replace('.webp', '.jpg')
+                with Image.open(output_path) as img:
+                    if img.mode in ('RGBA', 'LA', 'P'):
+                        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+                        if img.mode == 'P':
+                            img = img.convert('RGBA')
+                        rgb_img.paste(img, mask=img.getchannel('A') if 'A' in img.mode else None)
+                        img = rgb_img
+                    img.save(jpeg_path, 'JPEG', quality=95, optimize=True)
                 
-                tags = {
-                    "DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                    "CreateDate": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                    "ModifyDate": local_dt.strftime("%Y:%m:%d %H:%M:%S")
-                }
+                # Add full EXIF to JPEG
+                jpeg_tags = self.build_tags(local_dt, img_location)
                 
-                if img_location:
-                    tags.update(
-                        {
-                            "GPSLatitude": img_location["latitude"],
-                            "GPSLongitude": img_location["longitude"],
-                            "GPSLatitudeRef": "N" if img_location["latitude"] >= 0 else "S",
-                            "GPSLongitudeRef": "E" if img_location["longitude"] >= 0 else "W",
-                        }
-                    )
-
+                self.set_tags(
+                    jpeg_path, tags=jpeg_tags, params=["-overwrite_original"]
+                )
+                
+                os.remove(output_path)  # Remove WEBP since JPEG worked
+                self.verbose_msg(f"Converted {label} to JPEG with full EXIF: {jpeg_path}")
+                
+            except Exception as e3:
+                print(f"JPEG conversion also failed for {label} {output_path}: {e3}")
+                # Set file modification time as absolute last resort
                 try:
-                    with (
-                        et(executable=self.exiftool_path) if self.exiftool_path else et()
-                    ) as exif_tool:
-                        exif_tool.set_tags(
-                            output_path, tags=tags, params=["-P", "-overwrite_original", "-m"]
-                        )
-                    self.verbose_msg(f"Metadata added to fallback composite: {output_path}")
-                except Exception as e:
-                    # Try fallback approach for fallback composite
-                    try:
-                        fallback_tags = {"DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S")}
-                        if img_location:
-                            fallback_tags.update({
-                                "GPSLatitude": img_location["latitude"],
-                                "GPSLongitude": img_location["longitude"],
-                            })
-                        
-                        with (
-                            et(executable=self.exiftool_path) if self.exiftool_path else et()
-                        ) as exif_tool:
-                            exif_tool.set_tags(
-                                output_path, tags=fallback_tags, params=["-overwrite_original", "-m", "-q"]
-                            )
-                        self.verbose_msg(f"Fallback metadata added to fallback composite: {output_path}")
-                    except Exception as e2:
-                        print(f"WEBP metadata failed for fallback composite {output_path}, trying JPEG conversion...")
-                        # Convert fallback composite to JPEG
-                        try:
-                            jpeg_path = output_path.replace('.webp', '.jpg')
-                            with Image.open(output_path) as img:
-                                if img.mode in ('RGBA', 'LA', 'P'):
-                                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                                    if img.mode == 'P':
-                                        img = img.convert('RGBA')
-                                    rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                                    img = rgb_img
-                                img.save(jpeg_path, 'JPEG', quality=95, optimize=True)
-                            
-                            # Add full EXIF to JPEG
-                            jpeg_tags = {
-                                "DateTimeOriginal": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                                "CreateDate": local_dt.strftime("%Y:%m:%d %H:%M:%S"),
-                                "ModifyDate": local_dt.strftime("%Y:%m:%d %H:%M:%S")
-                            }
-                            if img_location:
-                                jpeg_tags.update({
-                                    "GPSLatitude": img_location["latitude"],
-                                    "GPSLongitude": img_location["longitude"],
-                                    "GPSLatitudeRef": "N" if img_location["latitude"] >= 0 else "S",
-                                    "GPSLongitudeRef": "E" if img_location["longitude"] >= 0 else "W",
-                                })
-                            
-                            with (
-                                et(executable=self.exiftool_path) if self.exiftool_path else et()
-                            ) as exif_tool:
-                                exif_tool.set_tags(
-                                    jpeg_path, tags=jpeg_tags, params=["-overwrite_original"]
-                                )
-                            
-                            os.remove(output_path)  # Remove WEBP since JPEG worked
-                            self.verbose_msg(f"Converted fallback composite to JPEG with full EXIF: {jpeg_path}")
-                            
-                        except Exception as e3:
-                            # Set file modification time as absolute last resort
-                            try:
-                                timestamp = local_dt.timestamp()
-                                os.utime(output_path, (timestamp, timestamp))
-                                self.verbose_msg(f"Set file modification time for fallback composite: {output_path}")
-                            except Exception:
-                                pass
+                    timestamp = local_dt.timestamp()
+                    os.utime(output_path, (timestamp, timestamp))
+                    self.verbose_msg(f"Set file modification time for {label}: {output_path}")
+                except Exception:
+                    pass
+
+    def filter_time_span(self, items: list, time_key: str) -> list:
+        """
+        Returns (item, datetime) pairs for the items whose time_key lies within the time span,
+        in chronological order. Each timestamp is parsed once, the range is found by bisection.
+        """
+        # Sorting the (datetime, index) pairs is close to linear, exports are mostly in order already
+        get_datetime_from_str = self.get_datetime_from_str
+        parsed = sorted(
+            (get_datetime_from_str(item[time_key]), i) for i, item in enumerate(items)
+        )
+        timestamps = [item_dt for item_dt, _ in parsed]
+        lo = bisect_left(timestamps, self.time_span[0])
+        hi = bisect_right(timestamps, self.time_span[1])
+        return [(items[i], item_dt) for item_dt, i in parsed[lo:hi]]
 
     def export_memories(self, memories: list):
         """
@@ -1164,13 +1688,10 @@ class BeRealExporter:
         """
         out_path_memories = os.path.join(self.out_path, "posts")  # Use posts folder
         os.makedirs(out_path_memories, exist_ok=True)
+        existing = set(os.listdir(out_path_memories))
 
         # Filter memories within time span first
-        valid_memories = []
-        for memory in memories:
-            memory_dt = self.get_datetime_from_str(memory["takenTime"])
-            if self.time_span[0] <= memory_dt <= self.time_span[1]:
-                valid_memories.append(memory)
+        valid_memories = self.filter_time_span(memories, "takenTime")
 
         if not valid_memories:
             self.verbose_msg("No memories found in the specified time range")
@@ -1183,8 +1704,8 @@ class BeRealExporter:
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 # Submit all tasks
                 future_to_memory = {
-                    executor.submit(self.process_memory, memory, out_path_memories): i 
-                    for i, memory in enumerate(valid_memories, 1)
+                    executor.submit(self.process_memory, memory, memory_dt, out_path_memories, existing): i 
+                    for i, (memory, memory_dt) in enumerate(valid_memories, 1)
                 }
                 
                 # Process completed tasks with progress bar
@@ -1201,43 +1722,64 @@ class BeRealExporter:
                             tqdm.write(f"Error processing memory {memory_index}: {e}")
                             pbar.update(1)
 
+        self.exif_writer.flush()
         self.verbose_msg(f"Completed exporting {len(valid_memories)} memories")
 
     def export_realmojis(self, realmojis: list):
         """
         Exports all realmojis from the Photos directory to the corresponding output folder.
+        Uses parallel processing for faster execution.
         """
         out_path_realmojis = os.path.join(self.out_path, "realmojis")
         os.makedirs(out_path_realmojis, exist_ok=True)
 
         # Filter realmojis within time span first
-        valid_realmojis = []
-        for realmoji in realmojis:
-            realmoji_dt = self.get_datetime_from_str(realmoji["postedAt"])
-            if self.time_span[0] <= realmoji_dt <= self.time_span[1]:
-                valid_realmojis.append((realmoji, realmoji_dt))
+        valid_realmojis = self.filter_time_span(realmojis, "postedAt")
 
         if not valid_realmojis:
             self.verbose_msg("No realmojis found in the specified time range")
             return
 
-        # Process with progress bar
+        # Realmojis from the same second share a file name. The last one in realmojis.json wins
+        # like when they were exported one after another, so go back to the input order
+        input_order = {id(realmoji): i for i, realmoji in enumerate(realmojis)}
+        valid_realmojis.sort(key=lambda pair: input_order[id(pair[0])])
+        unique_realmojis = {}
+        for realmoji, realmoji_dt in valid_realmojis:
+            local_dt = self.convert_to_local_time(realmoji_dt, None)
+            base_filename = file_timestamp(local_dt)
+            if base_filename in unique_realmojis:
+                self.verbose_msg(f"Skipping realmoji {base_filename} - a realmoji later in realmojis.json has the same time")
+            unique_realmojis[base_filename] = (realmoji, realmoji_dt, local_dt)
+        valid_realmojis = list(unique_realmojis.values())
+
+        self.verbose_msg(f"Processing {len(valid_realmojis)} realmojis with {self.max_workers} workers...")
+
+        # Process realmojis in parallel with progress bar
         with logging_redirect_tqdm() if self.verbose else tqdm(disable=False):
-            with tqdm(valid_realmojis, desc="Exporting realmojis", unit="realmoji",
-                     leave=True, position=0) as pbar:
-                for realmoji, realmoji_dt in pbar:
-                    # Convert to local time for filename (to match EXIF metadata)
-                    local_dt = self.convert_to_local_time(realmoji_dt, None)
-                    
-                    img_name = (
-                        f"{out_path_realmojis}/{local_dt.strftime('%Y-%m-%d_%H-%M-%S')}.webp"
-                    )
-                    old_img_name = os.path.join(
-                        self.bereal_path,
-                        realmoji["media"]["path"],
-                    )
-                    self.export_img(old_img_name, img_name, realmoji_dt, None)
-                    pbar.set_postfix_str(f"Latest: {local_dt.strftime('%Y-%m-%d_%H-%M-%S')}")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Submit all tasks
+                future_to_realmoji = {
+                    executor.submit(self.process_realmoji, realmoji, realmoji_dt, out_path_realmojis, local_dt): i
+                    for i, (realmoji, realmoji_dt, local_dt) in enumerate(valid_realmojis, 1)
+                }
+
+                # Process completed tasks with progress bar
+                with tqdm(total=len(valid_realmojis), desc="Exporting realmojis", unit="realmoji",
+                         leave=True, position=0) as pbar:
+                    for future in as_completed(future_to_realmoji):
+                        realmoji_index = future_to_realmoji[future]
+                        try:
+                            result = future.result()
+                            if result:
+                                pbar.set_postfix_str(f"Latest: {result}")
+                            pbar.update(1)
+                        except Exception as e:
+                            tqdm.write(f"Error processing realmoji {realmoji_index}: {e}")
+                            pbar.update(1)
+
+        self.exif_writer.flush()
+        self.verbose_msg(f"Completed exporting {len(valid_realmojis)} realmojis")
 
     def export_posts(self, posts: list):
         """
@@ -1254,13 +1796,10 @@ class BeRealExporter:
         """
         out_path_posts = os.path.join(self.out_path, "posts")
         os.makedirs(out_path_posts, exist_ok=True)
+        existing = set(os.listdir(out_path_posts))
 
         # Filter posts within time span first
-        valid_posts = []
-        for post in posts:
-            post_dt = self.get_datetime_from_str(post["takenAt"])
-            if self.time_span[0] <= post_dt <= self.time_span[1]:
-                valid_posts.append(post)
+        valid_posts = self.filter_time_span(posts, "takenAt")
 
         if not valid_posts:
             self.verbose_msg("No posts found in the specified time range")
@@ -1273,8 +1812,8 @@ class BeRealExporter:
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 # Submit all tasks
                 future_to_post = {
-                    executor.submit(self.process_post, post, out_path_posts): i 
-                    for i, post in enumerate(valid_posts, 1)
+                    executor.submit(self.process_post, post, post_dt, out_path_posts, existing): i 
+                    for i, (post, post_dt) in enumerate(valid_posts, 1)
                 }
                 
                 # Process completed tasks with progress bar
@@ -1291,8 +1830,233 @@ class BeRealExporter:
                             tqdm.write(f"Error processing post {post_index}: {e}")
                             pbar.update(1)
 
+        self.exif_writer.flush()
         self.verbose_msg(f"Completed exporting {len(valid_posts)} posts")
 
+    def process_conversation(self, conversation_id, image_files, chat_log_path, out_path_conversations, interactive_pbar=None):
+        """
+        Processes a single conversation folder (for parallel execution unless selections are interactive).
+        `image_files` and `chat_log_path` come from scan_conversations().
+        """
+        # The output folder is created by export_img, conversations without
+        # images in the time span don't leave an empty folder behind
+        out_conversation_folder = os.path.join(out_path_conversations, conversation_id)
+        out_prefix = out_conversation_folder + "/"
+        # Files from earlier runs are skipped, listed once instead of checked one by one
+        try:
+            existing = set(os.listdir(out_conversation_folder))
+        except FileNotFoundError:
+            existing = set()
+
+        # Check for chat log to get timestamps and user info
+        chat_log_by_id = {}
+        if chat_log_path:
+            try:
+                with open(chat_log_path, 'rb') as f:
+                    chat_log_data = json_loads(f.read())
+                    self.verbose_msg(f"Chat log structure: {type(chat_log_data)}")
+                    
+                    # Handle the actual structure: {"conversationId": "...", "messages": [{"id": "7", "userId": "...", "createdAt": "..."}]}
+                    if isinstance(chat_log_data, dict) and "messages" in chat_log_data:
+                        messages = chat_log_data["messages"]
+                        self.verbose_msg(f"Found {len(messages)} messages in chat log")
+                        
+                        for message in messages:
+                            if isinstance(message, dict) and "id" in message:
+                                # IDs may be numbers in the JSON, file names always give strings
+                                message_id = str(message["id"])
+                                chat_log_by_id[message_id] = message
+                                if self.verbose:
+                                    self.verbose_msg(f"Added message ID {message_id}: {message.get('createdAt', 'no timestamp')}")
+                    
+                    elif isinstance(chat_log_data, list):
+                        # Fallback: Array of entries
+                        for entry in chat_log_data:
+                            if isinstance(entry, dict) and "id" in entry:
+                                chat_log_by_id[str(entry["id"])] = entry
+                    
+                    self.verbose_msg(f"Loaded {len(chat_log_by_id)} chat log entries")
+                    if chat_log_by_id:
+                        sample_key = next(iter(chat_log_by_id))
+                        self.verbose_msg("Sample entry: ID %s (type: %s) -> %s", sample_key, type(sample_key), chat_log_by_id[sample_key])
+                        self.verbose_msg("All chat log IDs: %s", list(chat_log_by_id))  # Show all IDs
+                        
+            except Exception as e:
+                self.verbose_msg(f"Could not read chat log: {e}")
+                if self.verbose:
+                    import traceback
+                    self.verbose_msg(f"Full error: {traceback.format_exc()}")
+
+        # Group images by their ID prefix (matches chat_log.json id field)
+        image_groups = {}
+        for image in image_files:
+            # The ID was taken from the filename when listing the folder
+            file_id = image[2]
+            if file_id not in image_groups:
+                image_groups[file_id] = []
+            image_groups[file_id].append(image)
+            self.verbose_msg("Found image with ID %s: %s", file_id, image[1])
+        
+        # Sort files within each group to ensure consistent ordering
+        for file_id in image_groups:
+            image_groups[file_id].sort()
+        
+        # Debug: Show all groups found
+        if self.verbose:
+            self.verbose_msg(f"Found {len(image_groups)} image groups:")
+            for file_id, files in image_groups.items():
+                self.verbose_msg(f"  Group {file_id}: {len(files)} files - {[filename for _, filename, _, _, _ in files]}")
+
+        # Arguments for create_composite_image(), see create_composite_images()
+        composites = []
+
+        # Looked up once instead of per group
+        span_start, span_end = self.time_span
+        convert_to_local_time = self.convert_to_local_time
+        get_datetime_from_str = self.get_datetime_from_str
+
+        # Process each group
+        for file_id, group_images in image_groups.items():
+            group_files = [image_file for image_file, _, _, _, _ in group_images]
+
+            # Try to extract timestamp and user info from chat log using the file ID
+            img_dt = None
+            user_id = None
+            
+            try:
+                if self.verbose:
+                    self.verbose_msg(f"Looking for ID '{file_id}' (type: {type(file_id)}) in chat log...")
+                    self.verbose_msg("Available IDs in chat log: %s", list(islice(chat_log_by_id, 20)))
+                
+                # Chat log IDs were stored as strings when loading
+                found_entry = chat_log_by_id.get(file_id)
+                
+                if found_entry:
+                    img_dt = get_datetime_from_str(found_entry.get('createdAt', ''))
+                    user_id = found_entry.get('userId', 'unknown')
+                    if self.verbose:
+                        self.verbose_msg(f"✓ Found chat log entry for ID {file_id}: {found_entry.get('createdAt')} by user {user_id[:8]}...")
+                else:
+                    # Use modification time of first file in group
+                    img_dt = dt.fromtimestamp(group_images[0][4].stat().st_mtime)
+                    self.verbose_msg(f"✗ No chat log entry for ID {file_id}, using file modification time")
+            except (ValueError, KeyError) as e:
+                img_dt = dt.fromtimestamp(group_images[0][4].stat().st_mtime)
+                self.verbose_msg(f"✗ Error parsing chat log for ID {file_id}: {e}, using file modification time")
+
+            # Check if within time span
+            if not (span_start <= img_dt <= span_end):
+                continue
+
+            # Convert to local time for filename (to match EXIF metadata)
+            local_dt = convert_to_local_time(img_dt, None)
+            
+            # Include user ID in filename if available
+            user_suffix = f"_user_{user_id[:8]}" if user_id and user_id != 'unknown' else ""
+            name_prefix = f"{file_timestamp(local_dt)}_id{file_id}"
+            # Everything after the image number is the same for all images of the group
+            name_infix = user_suffix + "_"
+
+            # Export individual images with user info
+            exported_files = []
+            for i, (image_file, _, _, base_name, _) in enumerate(group_images):
+                output_filename = f"{name_prefix}_{i+1}{name_infix}{base_name}.webp"
+                output_path = out_prefix + output_filename
+                
+                exported_name = self.find_existing(existing, output_filename)
+                if exported_name:
+                    self.verbose_msg(f"Skipping {exported_name} - already exported")
+                    exported_path = out_prefix + exported_name
+                else:
+                    # export_img returns the final path, the extension may have been corrected
+                    exported_path = self.export_img(image_file, output_path, img_dt, None, local_dt)
+                if exported_path:
+                    exported_files.append(exported_path)
+
+            composite_filename = name_prefix + user_suffix + "_composited.webp"
+            if len(exported_files) == 2 and self.find_existing(existing, composite_filename):
+                self.verbose_msg(f"Skipping composite {composite_filename} - already exported")
+            # Create composite if we have exactly 2 images
+            elif len(exported_files) == 2:
+                composite_path = out_prefix + composite_filename
+                
+                # Choose detection method based on interactive mode
+                if self.web_ui and self.interactive_conversations:
+                    # Update interactive progress
+                    if interactive_pbar:
+                        interactive_pbar.set_description(f"Web UI: {conversation_id} msg {file_id}")
+                    
+                    # Create progress info
+                    progress_info = f"Interactive pair {interactive_pbar.n + 1} of {interactive_pbar.total}" if interactive_pbar else None
+                    
+                    primary_img, overlay_img = self.web_ui_choose_primary_overlay(
+                        exported_files, conversation_id, file_id, progress_info
+                    )
+                    
+                    # Update progress after selection
+                    if interactive_pbar:
+                        interactive_pbar.update(1)
+                        interactive_pbar.set_description("Interactive selections")
+                        
+                elif self.interactive_conversations:
+                    # Update interactive progress
+                    if interactive_pbar:
+                        interactive_pbar.set_description(f"CLI: {conversation_id} msg {file_id}")
+                    
+                    # Create progress info
+                    progress_info = f"Interactive pair {interactive_pbar.n + 1} of {interactive_pbar.total}" if interactive_pbar else None
+                    
+                    primary_img, overlay_img = self.interactive_choose_primary_overlay(
+                        group_files, exported_files, conversation_id, file_id, progress_info
+                    )
+                    
+                    # Update progress after selection
+                    if interactive_pbar:
+                        interactive_pbar.update(1)
+                        interactive_pbar.set_description("Interactive selections")
+                        
+                else:
+                    primary_img, overlay_img = self.detect_primary_overlay_conversation(group_files, exported_files)
+                
+                # Create composite if user didn't skip
+                if primary_img and overlay_img:
+                    composites.append((primary_img, overlay_img, composite_path, img_dt, None, local_dt))
+                    if self.verbose:
+                        self.verbose_msg(f"Queued composite for conversation ID {file_id} by user {user_id[:8] if user_id else 'unknown'}")
+                else:
+                    self.verbose_msg(f"Skipped composite for conversation ID {file_id}")
+
+        # Render all composites of the conversation at once
+        self.create_composite_images(composites)
+
+        self.verbose_msg(f"Exported conversation: {conversation_id}")
+        return conversation_id
+
+    @staticmethod
+    def scan_conversations(conversations_path: str) -> dict:
+        """
+        Lists all conversation folders and their contents in a single pass.
+        Returns {conversation_id: (images, chat_log.json path or None)}, where each image is
+        a (path, file name, ID prefix, name without extension, DirEntry) tuple.
+        """
+        conversations = {}
+        with os.scandir(conversations_path) as folders:
+            for folder in folders:
+                if not folder.is_dir():
+                    continue
+                image_files = []
+                chat_log_path = None
+                with os.scandir(folder.path) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if name == "chat_log.json":
+                            chat_log_path = entry.path
+                        elif name.endswith(".webp") and not name.startswith(".") and entry.is_file():
+                            # "7-gchAVq_kc0wAbj_tMMC3D.webp" -> ID "7"
+                            image_files.append((entry.path, name, name.partition('-')[0], name[:-5], entry))
+                conversations[folder.name] = (image_files, chat_log_path)
+        return conversations
+
     def export_conversations(self):
         """
         Exports all conversation images from the conversations directory.
@@ -1306,235 +2070,66 @@ class BeRealExporter:
         out_path_conversations = os.path.join(self.out_path, "conversations")
         os.makedirs(out_path_conversations, exist_ok=True)
 
-        # Get all conversation folders
-        conversation_folders = [f for f in os.listdir(conversations_path) 
-                             if os.path.isdir(os.path.join(conversations_path, f))]
+        # Get all conversation folders with their images and chat logs
+        conversations = self.scan_conversations(conversations_path)
 
-        # Count total interactive pairs if in interactive mode
+        # Count total interactive pairs if in interactive mode, from the scanned names only
         total_interactive_pairs = 0
         if self.interactive_conversations:
-            for conversation_id in conversation_folders:
-                conversation_folder = os.path.join(conversations_path, conversation_id)
-                image_files = glob.glob(os.path.join(conversation_folder, "*.webp"))
-                
-                # Quick grouping to count pairs
-                temp_groups = {}
-                for image_file in image_files:
-                    filename = os.path.basename(image_file)
-                    try:
-                        file_id = filename.split('-')[0]
-                        if file_id not in temp_groups:
-                            temp_groups[file_id] = []
-                        temp_groups[file_id].append(image_file)
-                    except (ValueError, IndexError):
-                        pass
-                
-                # Count pairs (groups with exactly 2 images)
-                for file_id, files in temp_groups.items():
-                    if len(files) == 2:
-                        total_interactive_pairs += 1
+            for image_files, _ in conversations.values():
+                # Pairs are the IDs with exactly 2 images
+                id_counts = Counter(file_id for _, _, file_id, _, _ in image_files)
+                total_interactive_pairs += sum(1 for count in id_counts.values() if count == 2)
 
         with logging_redirect_tqdm() if self.verbose else tqdm(disable=False):
             # Create main progress bar
-            main_pbar = tqdm(conversation_folders, desc="Exporting conversations", unit="conversation",
+            main_pbar = tqdm(total=len(conversations), desc="Exporting conversations", unit="conversation",
                            leave=True, position=0)
             
             # Create interactive progress bar if needed
             if self.interactive_conversations and total_interactive_pairs > 0:
-                interactive_pbar = tqdm(total=total_interactive_pairs, 
+                interactive_pbar = tqdm(total=total_interactive_pairs,
                                       desc="Interactive selections", unit="pair",
                                       leave=True, position=1)
-                interactive_count = 0
             else:
                 interactive_pbar = None
-                interactive_count = 0
             
-            for conversation_id in main_pbar:
-                    conversation_folder = os.path.join(conversations_path, conversation_id)
-                    out_conversation_folder = os.path.join(out_path_conversations, conversation_id)
-                    os.makedirs(out_conversation_folder, exist_ok=True)
+            if self.interactive_conversations:
+                # The selections need the terminal or browser one at a time, so stay serial
+                for conversation_id, (image_files, chat_log_path) in conversations.items():
+                    self.process_conversation(
+                        conversation_id, image_files, chat_log_path, out_path_conversations, interactive_pbar
+                    )
+                    main_pbar.set_postfix_str(f"Latest: {conversation_id}")
+                    main_pbar.update(1)
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    # Submit all tasks
+                    future_to_conversation = {
+                        executor.submit(
+                            self.process_conversation, conversation_id, image_files, chat_log_path, out_path_conversations
+                        ): conversation_id
+                        for conversation_id, (image_files, chat_log_path) in conversations.items()
+                    }
 
-                    # Get all image files in the conversation
-                    image_files = glob.glob(os.path.join(conversation_folder, "*.webp"))
-                    
-                    # Check for chat log to get timestamps and user info
-                    chat_log_path = os.path.join(conversation_folder, "chat_log.json")
-                    chat_log = []
-                    chat_log_by_id = {}
-                    if os.path.exists(chat_log_path):
+                    # Process completed tasks with progress bar
+                    for future in as_completed(future_to_conversation):
+                        conversation_id = future_to_conversation[future]
                         try:
-                            with open(chat_log_path, 'r', encoding='utf-8') as f:
-                                chat_log_data = json.load(f)
-                                self.verbose_msg(f"Chat log structure: {type(chat_log_data)}")
-                                
-                                # Handle the actual structure: {"conversationId": "...", "messages": [{"id": "7", "userId": "...", "createdAt": "..."}]}
-                                if isinstance(chat_log_data, dict) and "messages" in chat_log_data:
-                                    messages = chat_log_data["messages"]
-                                    self.verbose_msg(f"Found {len(messages)} messages in chat log")
-                                    
-                                    for message in messages:
-                                        if isinstance(message, dict) and "id" in message:
-                                            message_id = message["id"]
-                                            chat_log_by_id[message_id] = message
-                                            chat_log.append(message)
-                                            self.verbose_msg(f"Added message ID {message_id}: {message.get('createdAt', 'no timestamp')}")
-                                
-                                elif isinstance(chat_log_data, list):
-                                    # Fallback: Array of entries
-                                    chat_log = chat_log_data
-                                    for entry in chat_log:
-                                        if isinstance(entry, dict) and "id" in entry:
-                                            chat_log_by_id[entry["id"]] = entry
-                                
-                                self.verbose_msg(f"Loaded {len(chat_log_by_id)} chat log entries")
-                                if chat_log_by_id:
-                                    sample_key = list(chat_log_by_id.keys())[0]
-                                    self.verbose_msg(f"Sample entry: ID {sample_key} (type: {type(sample_key)}) -> {chat_log_by_id[sample_key]}")
-                                    self.verbose_msg(f"All chat log IDs: {list(chat_log_by_id.keys())}")  # Show all IDs
-                                    
+                            future.result()
+                            main_pbar.set_postfix_str(f"Latest: {conversation_id}")
                         except Exception as e:
-                            self.verbose_msg(f"Could not read chat log: {e}")
-                            import traceback
-                            self.verbose_msg(f"Full error: {traceback.format_exc()}")
-
-                    # Group images by their ID prefix (matches chat_log.json id field)
-                    image_groups = {}
-                    for image_file in image_files:
-                        filename = os.path.basename(image_file)
-                        try:
-                            # Extract ID from filename like "7-gchAVq_kc0wAbj_tMMC3D.webp" -> "7"
-                            file_id = filename.split('-')[0]
-                            if file_id not in image_groups:
-                                image_groups[file_id] = []
-                            image_groups[file_id].append(image_file)
-                            self.verbose_msg(f"Found image with ID {file_id}: {filename}")
-                        except (ValueError, IndexError):
-                            # Handle files without ID prefix
-                            if 'misc' not in image_groups:
-                                image_groups['misc'] = []
-                            image_groups['misc'].append(image_file)
-                            self.verbose_msg(f"Image without ID prefix: {filename}")
-                    
-                    # Sort files within each group to ensure consistent ordering
-                    for file_id in image_groups:
-                        image_groups[file_id].sort()
-                    
-                    # Debug: Show all groups found
-                    self.verbose_msg(f"Found {len(image_groups)} image groups:")
-                    for file_id, files in image_groups.items():
-                        self.verbose_msg(f"  Group {file_id}: {len(files)} files - {[os.path.basename(f) for f in files]}")
-
-                    # Process each group
-                    for file_id, group_files in image_groups.items():
-                        # Try to extract timestamp and user info from chat log using the file ID
-                        img_dt = None
-                        user_id = None
-                        
-                        try:
-                            self.verbose_msg(f"Looking for ID '{file_id}' (type: {type(file_id)}) in chat log...")
-                            self.verbose_msg(f"Available IDs in chat log: {list(chat_log_by_id.keys()) if len(chat_log_by_id) < 20 else list(chat_log_by_id.keys())[:20]}")
-                            
-                            # Try different ID formats (string vs int)
-                            found_entry = None
-                            if file_id in chat_log_by_id:
-                                found_entry = chat_log_by_id[file_id]
-                            elif str(file_id) in chat_log_by_id:
-                                found_entry = chat_log_by_id[str(file_id)]
-                            elif int(file_id) in chat_log_by_id:
-                                found_entry = chat_log_by_id[int(file_id)]
-                            
-                            if found_entry:
-                                img_dt = self.get_datetime_from_str(found_entry.get('createdAt', ''))
-                                user_id = found_entry.get('userId', 'unknown')
-                                self.verbose_msg(f"✓ Found chat log entry for ID {file_id}: {found_entry.get('createdAt')} by user {user_id[:8]}...")
-                            else:
-                                # Use modification time of first file in group
-                                img_dt = dt.fromtimestamp(os.path.getmtime(group_files[0]))
-                                self.verbose_msg(f"✗ No chat log entry for ID {file_id}, using file modification time")
-                                self.verbose_msg(f"✗ Tried looking for: '{file_id}', '{str(file_id)}', {int(file_id) if file_id.isdigit() else 'N/A'}")
-                        except (ValueError, KeyError) as e:
-                            img_dt = dt.fromtimestamp(os.path.getmtime(group_files[0]))
-                            self.verbose_msg(f"✗ Error parsing chat log for ID {file_id}: {e}, using file modification time")
-
-                        # Check if within time span
-                        if not (self.time_span[0] <= img_dt <= self.time_span[1]):
-                            continue
-
-                        # Convert to local time for filename (to match EXIF metadata)
-                        local_dt = self.convert_to_local_time(img_dt, None)
-                        
-                        # Export individual images with user info
-                        exported_files = []
-                        for i, image_file in enumerate(group_files):
-                            filename = os.path.basename(image_file)
-                            # Include user ID in filename if available
-                            user_suffix = f"_user_{user_id[:8]}" if user_id and user_id != 'unknown' else ""
-                            base_name = os.path.splitext(filename)[0]
-                            output_filename = f"{local_dt.strftime('%Y-%m-%d_%H-%M-%S')}_id{file_id}_{i+1}{user_suffix}_{base_name}.webp"
-                            output_path = os.path.join(out_conversation_folder, output_filename)
-                            
-                            self.export_img(image_file, output_path, img_dt, None)
-                            if os.path.exists(output_path):
-                                exported_files.append(output_path)
-
-                        # Create composite if we have exactly 2 images
-                        if len(exported_files) == 2:
-                            user_suffix = f"_user_{user_id[:8]}" if user_id and user_id != 'unknown' else ""
-                            composite_filename = f"{local_dt.strftime('%Y-%m-%d_%H-%M-%S')}_id{file_id}{user_suffix}_composited.webp"
-                            composite_path = os.path.join(out_conversation_folder, composite_filename)
-                            
-                            # Choose detection method based on interactive mode
-                            if self.web_ui and self.interactive_conversations:
-                                # Update interactive progress
-                                if interactive_pbar:
-                                    interactive_pbar.set_description(f"Web UI: {conversation_id} msg {file_id}")
-                                
-                                # Create progress info
-                                progress_info = f"Interactive pair {interactive_count + 1} of {total_interactive_pairs}" if interactive_pbar else None
-                                
-                                primary_img, overlay_img = self.web_ui_choose_primary_overlay(
-                                    exported_files, conversation_id, file_id, progress_info
-                                )
-                                
-                                # Update progress after selection
-                                if interactive_pbar:
-                                    interactive_pbar.update(1)
-                                    interactive_pbar.set_description("Interactive selections")
-                                    
-                            elif self.interactive_conversations:
-                                # Update interactive progress
-                                if interactive_pbar:
-                                    interactive_pbar.set_description(f"CLI: {conversation_id} msg {file_id}")
-                                
-                                # Create progress info
-                                progress_info = f"Interactive pair {interactive_count + 1} of {total_interactive_pairs}" if interactive_pbar else None
-                                
-                                primary_img, overlay_img = self.interactive_choose_primary_overlay(
-                                    group_files, exported_files, conversation_id, file_id, progress_info
-                                )
-                                
-                                # Update progress after selection
-                                if interactive_pbar:
-                                    interactive_pbar.update(1)
-                                    interactive_pbar.set_description("Interactive selections")
-                                    
-                            else:
-                                primary_img, overlay_img = self.detect_primary_overlay_conversation(group_files, exported_files)
-                            
-                            # Create composite if user didn't skip
-                            if primary_img and overlay_img:
-                                self.create_composite_image(primary_img, overlay_img, composite_path, img_dt, None)
-                                self.verbose_msg(f"Created composite for conversation ID {file_id} by user {user_id[:8] if user_id else 'unknown'}")
-                            else:
-                                self.verbose_msg(f"Skipped composite for conversation ID {file_id}")
+                            tqdm.write(f"Error processing conversation {conversation_id}: {e}")
+                        main_pbar.update(1)
+
+            main_pbar.close()
 
-                    main_pbar.set_postfix_str(f"Latest: {conversation_id}")
-                    self.verbose_msg(f"Exported conversation: {conversation_id}")
-            
             # Close interactive progress bar
             if interactive_pbar:
                 interactive_pbar.close()
 
+        self.exif_writer.flush()
+
 
 if __name__ == "__main__":
     args = init_parser()
@@ -1546,41 +2141,42 @@ if __name__ == "__main__":
         print(f"Error: {e}")
         exit(1)
 
-    if args.memories:
-        try:
-            memories_path = os.path.join(exporter.bereal_path, "memories.json")
-            if os.path.exists(memories_path):
-                with open(memories_path, encoding="utf-8") as f:
-                    memories = json.load(f)
+    with exporter:
+        if args.memories:
+            try:
+                memories_path = os.path.join(exporter.bereal_path, "memories.json")
+                if os.path.exists(memories_path):
+                    with open(memories_path, "rb") as f:
+                        memories = json_loads(f.read())
                     exporter.export_memories(memories)
-            else:
-                print("memories.json file not found, skipping memories export.")
-        except json.JSONDecodeError:
-            print("Error decoding memories.json file.")
+                else:
+                    print("memories.json file not found, skipping memories export.")
+            except json.JSONDecodeError:
+                print("Error decoding memories.json file.")
 
-    if args.posts:
-        try:
-            posts_path = os.path.join(exporter.bereal_path, "posts.json")
-            if os.path.exists(posts_path):
-                with open(posts_path, encoding="utf-8") as f:
-                    posts = json.load(f)
+        if args.posts:
+            try:
+                posts_path = os.path.join(exporter.bereal_path, "posts.json")
+                if os.path.exists(posts_path):
+                    with open(posts_path, "rb") as f:
+                        posts = json_loads(f.read())
                     exporter.export_posts(posts)
-            else:
-                print("posts.json file not found, skipping posts export.")
-        except json.JSONDecodeError:
-            print("Error decoding posts.json file.")
+                else:
+                    print("posts.json file not found, skipping posts export.")
+            except json.JSONDecodeError:
+                print("Error decoding posts.json file.")
 
-    if args.realmojis:
-        try:
-            realmojis_path = os.path.join(exporter.bereal_path, "realmojis.json")
-            if os.path.exists(realmojis_path):
-                with open(realmojis_path, encoding="utf-8") as f:
-                    realmojis = json.load(f)
+        if args.realmojis:
+            try:
+                realmojis_path = os.path.join(exporter.bereal_path, "realmojis.json")
+                if os.path.exists(realmojis_path):
+                    with open(realmojis_path, "rb") as f:
+                        realmojis = json_loads(f.read())
                     exporter.export_realmojis(realmojis)
-            else:
-                print("realmojis.json file not found, skipping realmojis export.")
-        except json.JSONDecodeError:
-            print("Error decoding realmojis.json file.")
+                else:
+                    print("realmojis.json file not found, skipping realmojis export.")
+            except json.JSONDecodeError:
+                print("Error decoding realmojis.json file.")
 
-    if args.conversations:
-        exporter.export_conversations()
+        if args.conversations:
+            exporter.export_conversations()